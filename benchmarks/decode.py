@@ -0,0 +1,68 @@
+"""
+Microbenchmark comparing decoding events one at a time with
+:meth:`.Event.from_raw` against decoding a whole buffer with
+:meth:`.Event.from_raw_many`
+
+This benchmark imports the installed ``powermate``, e.g. after ``pip install
+-e .``, or run it against the working tree from the top of the
+repository::
+
+    PYTHONPATH=. python benchmarks/decode.py --events 10000
+"""
+##############
+#  Standard  #
+##############
+import timeit
+import argparse
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+from powermate.event import Event, EventType, EVENT_SIZE
+
+
+def synthetic_buffer(n):
+    """
+    Packed binary for a burst of rotation events
+    """
+    return b''.join(Event(0, i, EventType.ROTATE, 7, 1).raw for i in range(n))
+
+
+def from_raw(data):
+    return [Event.from_raw(data[i:i+EVENT_SIZE])
+            for i in range(0, len(data), EVENT_SIZE)]
+
+
+def from_raw_many(data):
+    return Event.from_raw_many(data)
+
+
+def measure(func, data, repeat=5):
+    """
+    Best decode rate of ``func`` over ``data`` in events per second
+    """
+    n = len(data) // EVENT_SIZE
+    number = max(1, 100000 // n)
+    best = min(timeit.repeat(lambda: func(data), repeat=repeat, number=number))
+    return n * number / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Event decoding benchmark')
+    parser.add_argument('--events', type=int, default=64,
+                        help='Number of events decoded per call')
+    args = parser.parse_args()
+    data = memoryview(synthetic_buffer(args.events))
+    single = measure(from_raw, data)
+    batch  = measure(from_raw_many, data)
+    print('Event.from_raw      : {:>12,.0f} events/sec'.format(single))
+    print('Event.from_raw_many : {:>12,.0f} events/sec'.format(batch))
+    print('Speedup             : {:>12.2f}x'.format(batch / single))
+
+
+if __name__ == '__main__':
+    main()
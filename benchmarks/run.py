@@ -0,0 +1,260 @@
+"""
+Benchmark suite for the powermate event pipeline
+
+Each stage of the pipeline is measured separately and the results are written
+as JSON so that runs from different releases can be compared:
+
+- ``decode`` : :meth:`.Event.from_raw` and :meth:`.Event.from_raw_many`
+- ``encode`` : :attr:`.Event.raw` and :attr:`.LedEvent.raw`
+- ``dispatch`` : end-to-end :class:`.EventHandler` throughput from a replay
+- ``latency`` : time from a button press to the event being read from the
+  device and to the LED write, in milliseconds
+- ``latency_loaded`` : the same while another coroutine keeps the loop busy
+- ``idle_cpu`` : fraction of a core used by a single idle device
+
+The benchmarks import the installed ``powermate``, e.g. after ``pip install
+-e .``, or run them against the working tree from the top of the
+repository::
+
+    PYTHONPATH=. python benchmarks/run.py --output results.json
+"""
+##############
+#  Standard  #
+##############
+import sys
+import json
+import time
+import timeit
+import asyncio
+import argparse
+import platform
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate import (Event, LedEvent, PowerMateBase, PipeTransport,
+                       ReplayTransport)
+from powermate.event import EventType
+from decode import synthetic_buffer, from_raw, from_raw_many, measure
+
+#Events used to drive the handlers
+PRESS   = Event(1, 0, EventType.PUSH, 256, 1)
+RELEASE = Event(1, 0, EventType.PUSH, 256, 0)
+ROTATE  = Event(1, 0, EventType.ROTATE, 7, 1)
+SYN     = Event(1, 0, EventType.NULL, 0, 0)
+
+#Handler configurations compared by the loop benchmarks
+MODES = {'poll'   : dict(),
+         'reader' : dict(reader=True),
+         'thread' : dict(thread=True)}
+
+
+def percentile(samples, q):
+    """
+    Value below which ``q`` percent of the sorted ``samples`` fall
+    """
+    idx = min(len(samples) - 1, int(round(q / 100. * (len(samples) - 1))))
+    return samples[idx]
+
+
+def percentiles(samples):
+    samples = sorted(t * 1e3 for t in samples)
+    return {'p50'   : percentile(samples, 50),
+            'p99'   : percentile(samples, 99),
+            'p99.9' : percentile(samples, 99.9)}
+
+
+class Stamps:
+    """
+    Recorder noting the time each batch of events is read from the device
+
+    Implements the ``record`` and ``flush`` methods an :class:`.EventHandler`
+    expects of its ``recorder``, without a ``flush_interval`` so the handler
+    does not schedule flushes
+    """
+    def __init__(self):
+        self.times = list()
+
+    def record(self, events):
+        self.times.append(time.perf_counter())
+
+    def flush(self):
+        pass
+
+
+class Counter(PowerMateBase):
+    """
+    Counts rotations and stops on the first press
+    """
+    count = 0
+
+    def rotated(self, value, pressed=False):
+        self.count += 1
+
+    def pressed(self):
+        return Event.stop()
+
+
+class Responder(PowerMateBase):
+    """
+    Lights the LED while pressed and stops on rotation
+    """
+    def pressed(self):
+        return LedEvent.max()
+
+    def released(self, time, rotated=False):
+        return LedEvent.off()
+
+    def rotated(self, value, pressed=False):
+        return Event.stop()
+
+
+def bench_decode(events):
+    data = memoryview(synthetic_buffer(events))
+    return {'from_raw'      : measure(from_raw, data),
+            'from_raw_many' : measure(from_raw_many, data)}
+
+
+def bench_encode(number):
+    evt = Event(1, 2, EventType.ROTATE, 7, 1)
+    led = LedEvent.percent(50)
+    rates = dict()
+    for name, stmt in (('event_raw', lambda: evt.raw),
+                       ('led_raw',   lambda: led.raw),
+                       ('led_percent_raw', lambda: LedEvent.percent(50).raw)):
+        rates[name] = number / min(timeit.repeat(stmt, repeat=5,
+                                                 number=number))
+    return rates
+
+
+def bench_dispatch(events):
+    """
+    Events dispatched per second from a replay played as fast as possible
+    """
+    stream = [ROTATE, SYN] * events + [PRESS]
+    rates  = dict()
+    for name, kwargs in (('events', dict()),
+                         ('frames', dict(frames=True)),
+                         ('coalesce', dict(coalesce=True))):
+        loop = asyncio.new_event_loop()
+        pm = Counter(ReplayTransport.from_events(stream), loop=loop, **kwargs)
+        start = time.perf_counter()
+        pm.run()
+        rates[name] = len(stream) / (time.perf_counter() - start)
+        loop.close()
+    return rates
+
+
+async def busy(load):
+    """
+    Coroutine holding the loop for ``load`` seconds at a time
+    """
+    while True:
+        end = time.perf_counter() + load
+        while time.perf_counter() < end:
+            pass
+        await asyncio.sleep(0)
+
+
+def bench_latency(samples, load=0.):
+    """
+    Percentiles of the time from a press reaching the device to the LED write
+
+    With a ``load``, another coroutine holds the loop for that many seconds
+    between each chance the handler has to run
+    """
+    results = dict()
+    for name, kwargs in MODES.items():
+        loop = asyncio.new_event_loop()
+        transport = PipeTransport()
+        stamps = Stamps()
+        pm = Responder(transport, loop=loop, recorder=stamps, **kwargs)
+        written = list()
+
+        def on_write():
+            transport.received()
+            if written and not written[-1].done():
+                written[-1].set_result(time.perf_counter())
+
+        async def drive():
+            reads, timings = list(), list()
+            loop.add_reader(transport.peer_fileno(), on_write)
+            for i in range(samples):
+                for evt in (PRESS, RELEASE):
+                    written.append(loop.create_future())
+                    batch = len(stamps.times)
+                    start = time.perf_counter()
+                    transport.inject(evt.raw + SYN.raw)
+                    timings.append(await written[-1] - start)
+                    reads.append(stamps.times[batch] - start)
+            loop.remove_reader(transport.peer_fileno())
+            transport.inject(ROTATE.raw)
+            return reads, timings
+
+        task = loop.create_task(drive())
+        if load:
+            other = loop.create_task(busy(load))
+            task.add_done_callback(lambda t: other.cancel())
+        pm.run()
+        #Let the cancelled load finish before the loop is closed
+        if load:
+            loop.run_until_complete(asyncio.wait([other]))
+        reads, timings = task.result()
+        results[name] = {'read' : percentiles(reads),
+                         'led'  : percentiles(timings)}
+        transport.close()
+        loop.close()
+    return results
+
+
+def bench_idle_cpu(duration):
+    """
+    Fraction of a core used by a single device with no input
+    """
+    results = dict()
+    for name, kwargs in MODES.items():
+        loop = asyncio.new_event_loop()
+        transport = PipeTransport()
+        pm = Counter(transport, loop=loop, **kwargs)
+        #Stop the handler once the measurement is over
+        loop.call_later(duration, transport.inject, PRESS.raw)
+        wall, cpu = time.perf_counter(), time.process_time()
+        pm.run()
+        results[name] = ((time.process_time() - cpu)
+                         / (time.perf_counter() - wall))
+        transport.close()
+        loop.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Event pipeline benchmarks')
+    parser.add_argument('--output', help='Write the JSON results to a file')
+    parser.add_argument('--quick', action='store_true',
+                        help='Shorter runs for a quick check')
+    args = parser.parse_args()
+    scale = 0.1 if args.quick else 1.
+    results = {'version'   : powermate.__version__,
+               'python'    : platform.python_version(),
+               'platform'  : platform.platform(),
+               'timestamp' : time.time(),
+               'decode'    : bench_decode(64),
+               'encode'    : bench_encode(int(100000 * scale)),
+               'dispatch'  : bench_dispatch(int(50000 * scale)),
+               'latency'   : bench_latency(int(1000 * scale)),
+               'latency_loaded' : bench_latency(int(200 * scale), load=0.002),
+               'idle_cpu'  : bench_idle_cpu(2. * scale)}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
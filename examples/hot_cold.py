@@ -7,9 +7,8 @@ two seconds
 """
 
 import math
-import asyncio
 import argparse
-from powermate import LedEvent, PowerMateBase
+from powermate import Event, LedEvent, PowerMateBase
 
 class HotPowerMate(PowerMateBase):
     """
@@ -35,7 +34,7 @@ class HotPowerMate(PowerMateBase):
         Set the LED to the starting brightness
         """
         #Set the LED to the starting brightness
-        self._stream.send(self.warmth)
+        self._source.send(self.warmth)
 
     def on_exit(self):
         """
@@ -43,16 +42,14 @@ class HotPowerMate(PowerMateBase):
         """
         self.illuminate(0)
 
-    @asyncio.coroutine
-    def rotated(self, value, pressed=False):
+    async def rotated(self, value, pressed=False):
         """
         Reimplementation of rotate method to reset the LED on every rotation.
         """
         self.value += value
         return self.warmth
 
-    @asyncio.coroutine
-    def released(self, elapsed, rotated):
+    async def released(self, elapsed, rotated):
         """
         Reimplementation of button release to stop the demo if button is
         pressed for more than 2 seconds
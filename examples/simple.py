@@ -3,7 +3,6 @@ A simple instantiation of the PowerMate class to print the actions of the USB
 device as they happen. The methods also return :class:`.LedEvent` objects to
 light the bottom of the Powermate when pressed and turn it off when released
 """
-import asyncio
 from powermate import Event, PowerMateBase
 
 
@@ -21,8 +20,7 @@ class SimplePowerMate(PowerMateBase):
         """
         print('Done watching the PowerMate')
 
-    @asyncio.coroutine
-    def rotated(self, val, pressed):
+    async def rotated(self, val, pressed):
         """
         Run when the PowerMate is rotated
         """
@@ -33,20 +31,18 @@ class SimplePowerMate(PowerMateBase):
             print("PowerMate has been rotated {} counts ..."
                   "".format(val))
 
-    @asyncio.coroutine
-    def pressed(self):
+    async def pressed(self):
         """
         Run when the PowerMate is pressed
         """
         print("PowerMate has been pressed")
         return self.illuminate(100)
 
-    @asyncio.coroutine
-    def released(self, elapsed, rotated):
+    async def released(self, elapsed, rotated):
         """
         Run when the PowerMate is released
         """
-        super().released(elapsed)
+        await super().released(elapsed)
         print("PowerMate has been released after {} ms".format(elapsed))
         if rotated:
             print("The PowerMate was rotated during this time")
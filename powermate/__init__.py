@@ -1,6 +1,13 @@
 from .          import errors
-from .event     import Event, LedEvent
+from .event     import Event, LedEvent, coroutine, offload
 from .powermate import PowerMateBase
+from .manager   import PowerMateManager
+from .discovery import discover
+from .output    import LedOutput
+from .record    import Recorder, read_log, write_capture, CaptureReplay
+from .transport import (DeviceTransport, PipeTransport, SocketPairTransport,
+                        ReplayTransport)
+from .virtual   import VirtualPowerMate
 
 from ._version import get_versions
 __version__ = get_versions()['version']
@@ -0,0 +1,202 @@
+"""
+Discovery of connected PowerMates. Every input device registered in sysfs is
+checked against the USB vendor and product of the Griffin PowerMate, along with
+the stable links in ``/dev/input/by-id``.
+
+Scanning sysfs touches a handful of files per input device, so the result of
+:func:`.discover` is cached. The cache watches the device directory with
+inotify and is only refreshed after an input device has been added or removed.
+"""
+##############
+#  Standard  #
+##############
+import os
+import re
+import logging
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+from .watch import (_inotify, _check, INOTIFY_EVENT, IN_CREATE, IN_DELETE,
+                    IN_MOVED_TO, IN_MOVED_FROM, IN_DELETE_SELF, IN_IGNORED)
+
+logger = logging.getLogger(__name__)
+
+#USB identifiers of the Griffin PowerMate
+VENDOR_ID   = 0x077d
+PRODUCT_IDS = (0x0410, 0x04aa)
+
+_event_node = re.compile(r'^event(\d+)$')
+
+
+def _read_id(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip(), 16)
+    except (OSError, ValueError):
+        return None
+
+
+def _node_number(path):
+    return int(_event_node.match(os.path.basename(path)).group(1))
+
+
+def scan(sysfs='/sys', devices='/dev/input'):
+    """
+    Find every connected PowerMate, without using the cache
+
+    Parameters
+    ----------
+    sysfs : str, optional
+        Mount point of sysfs
+
+    devices : str, optional
+        Directory holding the input device nodes
+
+    Returns
+    -------
+    paths : list
+        Event node of each PowerMate, e.g. ``/dev/input/event3``
+    """
+    found = set()
+    #Identifiers reported by the kernel for each input device
+    classes = os.path.join(sysfs, 'class', 'input')
+    try:
+        nodes = os.listdir(classes)
+    except FileNotFoundError:
+        nodes = list()
+    for node in nodes:
+        if not _event_node.match(node):
+            continue
+        ids = os.path.join(classes, node, 'device', 'id')
+        if (_read_id(os.path.join(ids, 'vendor')) == VENDOR_ID
+                and _read_id(os.path.join(ids, 'product')) in PRODUCT_IDS):
+            found.add(os.path.join(devices, node))
+    #Links created by udev for each USB device
+    by_id = os.path.join(devices, 'by-id')
+    try:
+        links = os.listdir(by_id)
+    except FileNotFoundError:
+        links = list()
+    for link in links:
+        if 'PowerMate' not in link or '-event-' not in link:
+            continue
+        node = os.path.basename(os.path.realpath(os.path.join(by_id, link)))
+        if _event_node.match(node):
+            found.add(os.path.join(devices, node))
+    return sorted(found, key=_node_number)
+
+
+class DeviceCache:
+    """
+    Cached result of :func:`.scan`
+
+    The cache is refreshed when inotify reports a change to the device
+    directory, checking for a change is a single non-blocking read. Without
+    inotify, or a device directory, every lookup scans again
+
+    Parameters
+    ----------
+    sysfs : str, optional
+        Mount point of sysfs
+
+    devices : str, optional
+        Directory holding the input device nodes
+    """
+    def __init__(self, sysfs='/sys', devices='/dev/input'):
+        self.sysfs   = sysfs
+        self.devices = devices
+        self._paths  = None
+        self._fd     = None
+        try:
+            libc = _inotify()
+            self._fd = _check(libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC))
+            _check(libc.inotify_add_watch(self._fd, os.fsencode(devices),
+                                          IN_CREATE | IN_DELETE | IN_MOVED_TO
+                                          | IN_MOVED_FROM | IN_DELETE_SELF))
+        except OSError as exc:
+            logger.debug("Unable to watch %s, discovery is not cached: %s",
+                         devices, exc)
+            self.close()
+
+    def _changed(self):
+        """
+        Whether the device directory changed since the last check
+        """
+        if self._fd is None:
+            return True
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            changed = True
+            #Without a watched directory every lookup has to scan
+            if any(mask & IN_IGNORED for mask in self._masks(data)):
+                self.close()
+                return True
+
+    @staticmethod
+    def _masks(data):
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, size = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size + size
+            yield mask
+
+    def paths(self):
+        """
+        Event node of each connected PowerMate
+
+        Returns
+        -------
+        paths : list
+        """
+        if self._changed() or self._paths is None:
+            self._paths = scan(sysfs=self.sysfs, devices=self.devices)
+            logger.debug("Found PowerMates %s", self._paths)
+        return list(self._paths)
+
+    def invalidate(self):
+        """
+        Scan again on the next lookup
+        """
+        self._paths = None
+
+    def close(self):
+        """
+        Stop watching the device directory
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+_cache = None
+
+
+def discover(refresh=False):
+    """
+    Find every connected PowerMate
+
+    Parameters
+    ----------
+    refresh : bool, optional
+        Scan sysfs even if the cached result is up to date
+
+    Returns
+    -------
+    paths : list
+        Event node of each PowerMate, e.g. ``/dev/input/event3``
+    """
+    global _cache
+    if _cache is None:
+        _cache = DeviceCache()
+    if refresh:
+        _cache.invalidate()
+    return _cache.paths()
@@ -3,3 +3,15 @@ class EventNotImplemented(NotImplementedError):
     Special exception type for non-implemented events.
     """
     pass
+
+class EndOfStream(EOFError):
+    """
+    Raised when a finite source of events, e.g. a replay, has been exhausted
+    """
+    pass
+
+class DeviceNotFound(FileNotFoundError):
+    """
+    Raised when no connected PowerMate could be found
+    """
+    pass
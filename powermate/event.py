@@ -18,10 +18,17 @@ way to create these is by using the class methods :meth:`.Event.stop`,
 #  Standard  #
 ##############
 import os
+import time
+import types
+import select
 import struct
 import asyncio
+import inspect
 import logging
+import functools
+import threading
 import collections
+import concurrent.futures
 from enum import Enum
 
 ##############
@@ -31,13 +38,21 @@ from enum import Enum
 ##############
 #   Module   #
 ##############
-from .errors import EventNotImplemented
+from .errors    import EventNotImplemented, EndOfStream
+from .transport import Transport, DeviceTransport
+from .watch     import DeviceWatcher
+from .output    import LedOutput
 
 logger = logging.getLogger(__name__)
 
 EVENT_FORMAT = 'llHHi'
 EVENT_SIZE   = struct.calcsize(EVENT_FORMAT)
 
+#Precompiled for decoding batches of events
+EVENT_STRUCT = struct.Struct(EVENT_FORMAT)
+
+SYN_REPORT      = 0x00
+SYN_DROPPED     = 0x03
 MSC_PULSELED    = 0x01
 MAX_BRIGHTNESS  = 255
 MAX_PULSE_SPEED = 255
@@ -54,6 +69,9 @@ class EventType(Enum):
     #API Defined
     STOP   = 0x06
 
+#Flat lookup of EventType by raw value, avoids the Enum constructor
+_event_types = dict((_type.value, _type) for _type in EventType)
+
 class Event:
     """
     A Powermate Event
@@ -75,6 +93,10 @@ class Event:
     value: int
         Associated value with event
     """
+    __slots__ = ('tv_sec', 'tv_usec', 'type', 'code', 'value')
+    #Attributes shown in the representation
+    _fields   = __slots__
+
     def __init__(self, tv_sec, tv_usec, _type, code, value):
         self.tv_sec   = tv_sec
         self.tv_usec  = tv_usec
@@ -118,10 +140,40 @@ class Event:
         tv_sec, tv_usec, type, code, value = struct.unpack(EVENT_FORMAT, data)
         return cls(tv_sec, tv_usec, EventType(type), code, value)
 
+    @classmethod
+    def from_raw_many(cls, data):
+        """
+        Generate ``Event`` objects from a buffer of packed events
+
+        Events with an unrecognized type are logged and skipped rather than
+        discarding the rest of the buffer
+
+        Parameters
+        ----------
+        data : bytes-like
+            Binary information to unpack, the length must be a multiple of
+            ``EVENT_SIZE``
+
+        Returns
+        -------
+        events : list
+            List of :class:`.Event`
+        """
+        events = list()
+        types  = _event_types
+        for (tv_sec, tv_usec,
+             type, code, value) in EVENT_STRUCT.iter_unpack(data):
+            _type = types.get(type)
+            if _type is None:
+                logger.critical('Unrecognized event value')
+                continue
+            events.append(cls(tv_sec, tv_usec, _type, code, value))
+        return events
+
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__,
                                ', '.join('{}={}'.format(k, getattr(self, k))
-                               for k in self.__dict__ if not k.startswith('_')))
+                               for k in self._fields))
 
 class LedEvent(Event):
     """
@@ -144,34 +196,59 @@ class LedEvent(Event):
 
     awake : int
         Defines awake behavior
+
+    Notes
+    -----
+    LedEvents are immutable, the packed ``value`` and ``raw`` binary are
+    computed once when the event is created
     """
+    __slots__ = ('brightness', 'speed', 'pulse_type', 'asleep', 'awake',
+                 '_raw')
+    _fields   = ('tv_sec', 'tv_usec', 'type', 'code',
+                 'brightness', 'speed', 'pulse_type', 'asleep', 'awake')
+
     MAX_BRIGHTNESS  =  MAX_BRIGHTNESS 
     MAX_PULSE_SPEED =  MAX_PULSE_SPEED
 
     def __init__(self, brightness=0, speed=0,
            pulse_type=0, asleep=0, awake=0):
-        super().__init__(0, 0, EventType.MISC, MSC_PULSELED, 0)
-        self.brightness = brightness
-        self.speed      = speed
-        self.pulse_type = pulse_type
-        self.asleep     = asleep
-        self.awake      = awake
+        #Packed binary instruction for the Powermate LED
+        value = (brightness |
+                (speed << 8) |
+                (pulse_type << 17) |
+                (asleep << 19) |
+                (awake << 20))
+        #Assign through object as LedEvent blocks attribute setting
+        _set = object.__setattr__
+        _set(self, 'tv_sec',     0)
+        _set(self, 'tv_usec',    0)
+        _set(self, 'type',       EventType.MISC)
+        _set(self, 'code',       MSC_PULSELED)
+        _set(self, 'value',      value)
+        _set(self, 'brightness', brightness)
+        _set(self, 'speed',      speed)
+        _set(self, 'pulse_type', pulse_type)
+        _set(self, 'asleep',     asleep)
+        _set(self, 'awake',      awake)
+        _set(self, '_raw', struct.pack(EVENT_FORMAT, 0, 0, EventType.MISC.value,
+                                       MSC_PULSELED, value))
 
     @property
-    def value(self):
+    def raw(self):
         """
-        Packed binary instruction for the Powermate LED
+        Converted event information expressed as binary
         """
-        return (self.brightness |
-               (self.speed << 8) |
-               (self.pulse_type << 17) |
-               (self.asleep << 19) |
-               (self.awake << 20))
+        return self._raw
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
 
-    #Silently ignore all value sets
-    @value.setter
-    def value(self, value):
-        pass
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __reduce__(self):
+        return (self.__class__, (self.brightness, self.speed, self.pulse_type,
+                                 self.asleep, self.awake))
 
     @classmethod
     def pulse(cls):
@@ -182,7 +259,8 @@ class LedEvent(Event):
         -------
         event : :class:`.LedEvent`
         """
-        return cls(speed=MAX_PULSE_SPEED, pulse_type=2, asleep=1, awake=1)
+        return cls.shared(speed=MAX_PULSE_SPEED, pulse_type=2,
+                          asleep=1, awake=1)
 
     @classmethod
     def max(cls):
@@ -193,7 +271,7 @@ class LedEvent(Event):
         -------
         event : :class:`.LedEvent`
         """
-        return cls(brightness=MAX_BRIGHTNESS)
+        return cls.shared(brightness=MAX_BRIGHTNESS)
 
     @classmethod
     def off(cls):
@@ -204,7 +282,7 @@ class LedEvent(Event):
         -------
         event : :class:`.LedEvent`
         """
-        return cls(brightness=0)
+        return cls.shared(brightness=0)
 
     @classmethod
     def percent(cls, percent):
@@ -221,7 +299,245 @@ class LedEvent(Event):
         -------
         event : :class:`.LedEvent`
         """
-        return cls(brightness=round(percent/100. * MAX_BRIGHTNESS))
+        return cls.shared(brightness=round(percent/100. * MAX_BRIGHTNESS))
+
+    @classmethod
+    def shared(cls, brightness=0, speed=0, pulse_type=0, asleep=0, awake=0):
+        """
+        Return a shared, pre-packed instance for an LED setting
+
+        Every brightness level and the default pulse are built when the module
+        is imported. Other settings, e.g. an out of range brightness, are
+        created anew for each request so that the set of shared instances
+        stays fixed. Subclasses always receive a new instance
+
+        Returns
+        -------
+        event : :class:`.LedEvent`
+        """
+        key = (brightness, speed, pulse_type, asleep, awake)
+        if cls is not LedEvent:
+            return cls(*key)
+        led = _led_cache.get(key)
+        if led is None:
+            return cls(*key)
+        return led
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Unpack the ``value`` of an ``MSC_PULSELED`` event
+
+        Parameters
+        ----------
+        value : int
+            Packed LED instruction
+
+        Returns
+        -------
+        event : :class:`.LedEvent`
+        """
+        return cls.shared(brightness=value & 0xff,
+                          speed=(value >> 8) & 0x1ff,
+                          pulse_type=(value >> 17) & 0x3,
+                          asleep=(value >> 19) & 0x1,
+                          awake=(value >> 20) & 0x1)
+
+#Interned LedEvents keyed by (brightness, speed, pulse_type, asleep, awake)
+_led_cache = dict(((level, 0, 0, 0, 0), LedEvent(brightness=level))
+                  for level in range(MAX_BRIGHTNESS + 1))
+#Pre-build the default pulse
+_pulse = (0, MAX_PULSE_SPEED, 2, 1, 1)
+_led_cache[_pulse] = LedEvent(*_pulse)
+
+
+class Frame:
+    """
+    Events reported by the kernel as a single unit
+
+    The kernel terminates each group of related events with a ``SYN_REPORT``,
+    a Frame holds every event received since the previous one
+
+    Parameters
+    ----------
+    events : list
+        Events contained in the frame, not including the ``SYN_REPORT``
+
+    syn : :class:`.Event`
+        The ``SYN_REPORT`` that terminated the frame
+
+    Attributes
+    ----------
+    push : :class:`.Event` or None
+        Last button event in the frame
+
+    rotate : :class:`.Event` or None
+        Rotation event carrying the total rotation of the frame
+    """
+    __slots__ = ('events', 'tv_sec', 'tv_usec', 'push', 'rotate')
+
+    def __init__(self, events, syn):
+        self.events  = events
+        self.tv_sec  = syn.tv_sec
+        self.tv_usec = syn.tv_usec
+        self.push    = None
+        self.rotate  = None
+        for evt in events:
+            if evt.type == EventType.PUSH:
+                self.push = evt
+            elif evt.type == EventType.ROTATE:
+                if self.rotate:
+                    evt = Event(evt.tv_sec, evt.tv_usec, EventType.ROTATE,
+                                evt.code, self.rotate.value + evt.value)
+                self.rotate = evt
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.events)
+
+
+#Overload policies of an EventQueue
+BLOCK           = 'block'
+DROP_OLDEST     = 'drop-oldest'
+DROP_NEWEST     = 'drop-newest'
+MERGE_ROTATIONS = 'merge-rotations'
+POLICIES        = (BLOCK, DROP_OLDEST, DROP_NEWEST, MERGE_ROTATIONS)
+
+
+class EventQueue(collections.deque):
+    """
+    Bounded queue of events read from the PowerMate awaiting dispatch
+
+    Without a limit, events read faster than the handlers consume them pile
+    up and every new event waits behind the whole backlog. The policy decides
+    what happens to events that arrive while the queue is full:
+
+    - ``block`` : Accept the events, but the :class:`.EventHandler` stops
+      reading the device until half of the queue has been dispatched, leaving
+      further events with the kernel
+    - ``drop-oldest`` : Discard the events that have waited the longest
+    - ``drop-newest`` : Discard the arriving events
+    - ``merge-rotations`` : Add arriving rotations to the last queued
+      rotation. Button events are never discarded and may exceed the limit
+
+    Dropping events can separate a press from its release, use
+    ``merge-rotations`` if the handlers track the state of the button
+
+    Parameters
+    ----------
+    maxsize : int
+        Number of events the queue holds before the policy applies
+
+    policy : str, optional
+        One of :data:`.POLICIES`
+
+    high_water : int, optional
+        Length of the queue that triggers ``on_high_water``, by default
+        ``maxsize``
+
+    on_high_water : callable, optional
+        Called with the number of queued events each time the queue grows to
+        ``high_water``
+
+    Attributes
+    ----------
+    stats : ``collections.Counter``
+        Number of events ``dropped`` and rotations ``merged`` by the policy,
+        times the queue rose to the ``high_water`` mark and times reading was
+        ``blocked``
+    """
+    def __init__(self, maxsize, policy=BLOCK, high_water=None,
+                 on_high_water=None):
+        if policy not in POLICIES:
+            raise ValueError("Unknown queue policy {!r}, expected one of {}"
+                             "".format(policy, ', '.join(POLICIES)))
+        if maxsize < 1:
+            raise ValueError("Queue must hold at least one event")
+        super().__init__()
+        self.maxsize       = maxsize
+        self.policy        = policy
+        self.high_water    = high_water or maxsize
+        self.on_high_water = on_high_water
+        self.stats         = collections.Counter()
+        self._merged       = False
+
+    @property
+    def full(self):
+        """
+        Whether the queue holds ``maxsize`` events or more
+        """
+        return len(self) >= self.maxsize
+
+    def extend(self, events):
+        """
+        Queue events, applying the policy to those that do not fit
+
+        Parameters
+        ----------
+        events : list
+            Events read from the PowerMate
+        """
+        before = len(self)
+        if self.policy == BLOCK or before + len(events) <= self.maxsize:
+            super().extend(events)
+            self._merged = False
+        elif self.policy == DROP_OLDEST:
+            super().extend(events)
+            excess = len(self) - self.maxsize
+            for _ in range(excess):
+                self.popleft()
+            self.stats['dropped'] += excess
+        elif self.policy == DROP_NEWEST:
+            room = max(self.maxsize - before, 0)
+            super().extend(events[:room])
+            self.stats['dropped'] += len(events) - room
+        else:
+            for evt in events:
+                self._merge(evt)
+        #Report the queue rising to the mark, not every event above it
+        after = len(self)
+        if before < self.high_water <= after:
+            self.stats['high_water'] += 1
+            if self.on_high_water:
+                try:
+                    self.on_high_water(after)
+                except Exception:
+                    logger.exception("Error reporting the queue high water "
+                                     "mark")
+
+    def _merge(self, evt):
+        """
+        Queue a single event, adding rotations to the last queued rotation
+        while the queue is full
+        """
+        if len(self) < self.maxsize:
+            self._merged = False
+            self.append(evt)
+            return
+        if evt.type == EventType.ROTATE:
+            #Last queued event other than synchronization
+            for i in range(len(self) - 1, -1, -1):
+                if self[i].type != EventType.NULL:
+                    break
+            else:
+                i = None
+            #Only rotations with no button event in between are combined
+            if i is not None and self[i].type == EventType.ROTATE:
+                self[i] = Event(evt.tv_sec, evt.tv_usec, EventType.ROTATE,
+                                evt.code, self[i].value + evt.value)
+                self.stats['merged'] += 1
+                self._merged = True
+                return
+        #The SYN_REPORT of a merged rotation is already queued
+        elif evt.type == EventType.NULL and self._merged:
+            self._merged = False
+            return
+        self._merged = False
+        self.append(evt)
+
+    def __repr__(self):
+        return '<{} ({}/{} events, {})>'.format(self.__class__.__name__,
+                                                len(self), self.maxsize,
+                                                self.policy)
 
 
 class Socket:
@@ -233,80 +549,288 @@ class Socket:
 
     Parameters
     ----------
-    path : str
-        Filepath to Powermate USB
-    
+    path : str or :class:`.Transport`
+        Filepath to Powermate USB, or an existing transport to communicate
+        over
+
+    recorder : :class:`.Recorder`, optional
+        Recorder that every decoded event is written to
+
     Attributes
     ----------
+    transport : :class:`.Transport`
+        Connection to the PowerMate
+
+    led : :class:`.LedEvent` or None
+        Last LED instruction accepted by the transport, i.e. the state the
+        LED is believed to show
+
     stream : generator
         A generator that monitors the input socket, events sent the generator
         using ``stream.send`` will also be written back into output
     """
     _event_size = EVENT_SIZE
-
-    def __init__(self, path):
-        self.path    = path
-        self._output = open(self.path, 'rb')  
-        self._input  = open(self.path, 'wb')  
+    #Maximum number of events requested per read
+    _read_events = 64
+
+    def __init__(self, path, recorder=None):
+        if not isinstance(path, Transport):
+            path = DeviceTransport(path)
+        self.transport = path
+        self.path      = self.transport.path
+        self.recorder  = recorder
+        self.led       = None
+        #Reusable buffer large enough for a full batch of events
+        self._buffer = bytearray(self._event_size * self._read_events)
+        self._view   = memoryview(self._buffer)
+        #Number of bytes of a partial event held at the front of the buffer
+        self._filled = 0
+        self._pending = collections.deque()
         self.stream  = self._watch()
-    
-    def send(self, evt):
+
+    def fileno(self):
+        """
+        File descriptor events are read from
+        """
+        return self.transport.fileno()
+
+    def read(self):
+        """
+        Read every complete event currently available from the Powermate
+
+        All of the events queued by the kernel, up to the size of the internal
+        buffer, are read with a single call. Partial events are held until the
+        remaining bytes arrive
+
+        Returns
+        -------
+        events : list
+            Every :class:`.Event` that could be decoded
+        """
+        n = self.transport.readinto(self._view[self._filled:])
+        #Nothing available
+        if not n:
+            return list()
+        filled = self._filled + n
+        end    = filled - filled % self._event_size
+        #Create Events from the raw binary
+        events = Event.from_raw_many(self._view[:end])
+        if self.recorder:
+            self.recorder.record(events)
+        #Move the trailing partial event to the front of the buffer
+        self._filled = filled - end
+        if self._filled:
+            self._buffer[:self._filled] = bytes(self._view[end:filled])
+        logger.debug("Received %s events ...", len(events))
+        return events
+
+    def send(self, evt, force=False):
         """
         Send an event to the Powermate without viewing respsonse
 
+        LED instructions identical to the current state of the LED are not
+        written
+
         Parameters
         ----------
         evt : :class:`.Event`
             Sent event
+
+        force : bool, optional
+            Write LED instructions even if the LED already shows that state
+
+        Returns
+        -------
+        written : bool
+            Whether the event was written to the transport
         """
         #Don't send None
         if not evt:
-            return
+            return False
         #Only send events
         if not isinstance(evt, Event):
             raise TypeError(evt)
+        is_led = isinstance(evt, LedEvent)
+        #The LED already shows this state
+        if (is_led and not force and self.led is not None
+                and self.led.value == evt.value):
+            return False
         logger.debug("Sending event %s ...", evt)
         #Write the value
-        self._input.write(evt.raw)
-        self._input.flush()
+        self.transport.write(evt.raw)
+        if is_led:
+            self.led = evt
+        return True
+
+    def close(self):
+        """
+        Close the connection to the Powermate
+        """
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def _watch(self):
-        data  = b''
         event = None
-        #Open file stream
-        with self._output as stream:
-            #Always start from EOF
-            stream.seek(0, os.SEEK_END)
-            #Continually monitor USB
-            while True:
-                #Send an event and check response
-                ret = yield event
-                #If we received an event back
-                if ret:
-                    logger.debug("Writing %s back to PowerMate ...", ret)
-                    self._input.write(ret.raw)
-                    self._input.flush()
-                try:
-                    data += stream.read(self._event_size)
-                except OSError as e:
-                    if e.errno == 11:
-                        raise ConnectionError('PowerMate disconnected')
-                    else:
-                        raise
-                #When we have a full event
-                if len(data) >= self._event_size:
-                    #Create Event object, and delete from collected stream
-                    try:
-                        #Create an Event from the raw binary
-                        event = Event.from_raw(data[:self._event_size])
-                        logger.debug("Received %s ...", event)
-                    except ValueError:
-                        logger.critical('Unrecognized event value')
-                    #Discard last event from buffer
-                    data  = data[self._event_size:]
-                #Otherwise send a blank event
-                else:
-                    event = None
+        #Continually monitor USB
+        while True:
+            #Send an event and check response
+            ret = yield event
+            #If we received an event back
+            if ret:
+                logger.debug("Writing %s back to PowerMate ...", ret)
+                self.send(ret)
+            #Only go back to the device once the last batch is consumed
+            if not self._pending:
+                self._pending.extend(self.read())
+            #Otherwise send a blank event
+            event = self._pending.popleft() if self._pending else None
+
+
+def coroutine(func):
+    """
+    Compatibility replacement for the ``asyncio.coroutine`` decorator
+
+    ``asyncio.coroutine`` was removed in Python 3.11. Handlers written for
+    earlier releases of this package as generators using ``yield from`` can
+    swap the decorator for this one to run unchanged. Plain functions are
+    wrapped so that they can be awaited
+
+    Parameters
+    ----------
+    func : callable
+        Generator function, plain function or ``async def`` function
+
+    Returns
+    -------
+    func : callable
+        A native coroutine function
+    """
+    if inspect.iscoroutinefunction(func):
+        return func
+    #Allow the generator to yield from native coroutines
+    if inspect.isgeneratorfunction(func):
+        func = types.coroutine(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    return wrapper
+
+
+def offload(func=None, executor=None, bound=True):
+    """
+    Run a handler in an executor instead of the event loop
+
+    Handlers that perform heavy computation or call blocking libraries would
+    otherwise hold up the loop, and with it the reading of the PowerMate. The
+    decorated handler is awaited like a coroutine, its return value is brought
+    back to the loop and written to the PowerMate as usual
+
+    .. code::
+
+        class Mixer(PowerMateBase):
+
+            @offload
+            def rotated(self, value, pressed=False):
+                return LedEvent.percent(recompute_filter(value))
+
+    The instance can not be sent to another process, so a handler run in a
+    ``ProcessPoolExecutor`` must be created with ``bound=False``. It is then
+    called without the instance, and should be a function defined at module
+    level whose arguments and return value can be pickled
+
+    .. code::
+
+        def recompute(value, pressed=False):
+            ...
+
+        class Mixer(PowerMateBase):
+            rotated = offload(recompute, executor=ProcessPoolExecutor(),
+                              bound=False)
+
+    Parameters
+    ----------
+    func : callable
+        Plain function that implements the handler
+
+    executor : ``concurrent.futures.Executor``, optional
+        Executor to run the handler in. By default the ``executor`` of the
+        :class:`.EventHandler` is used, or the default executor of the loop if
+        that is not set either
+
+    bound : bool, optional
+        Whether ``func`` is a method receiving the instance. This applies
+        whatever executor the handler runs in
+
+    Returns
+    -------
+    func : callable
+        A native coroutine function
+
+    Raises
+    ------
+    TypeError
+        If ``func`` is a coroutine function, or a bound handler is given a
+        ``ProcessPoolExecutor``
+    """
+    #Used with arguments
+    if func is None:
+        return functools.partial(offload, executor=executor, bound=bound)
+    if inspect.iscoroutinefunction(func) or inspect.isgeneratorfunction(func):
+        raise TypeError("Only plain functions can be offloaded, {!r} is a "
+                        "coroutine function".format(func))
+    if bound:
+        _check_unbound(func, executor)
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        pool = executor if executor is not None else self.executor
+        if bound:
+            _check_unbound(func, pool)
+            call = functools.partial(func, self, *args, **kwargs)
+        else:
+            call = functools.partial(func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+    wrapper._offload = (executor, bound)
+    return wrapper
+
+
+def _check_unbound(func, executor):
+    """
+    Reject running a method in another process
+    """
+    if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        raise TypeError("{} receives the handler instance, which can not be "
+                        "sent to a process pool. Offload a module level "
+                        "function with bound=False instead"
+                        "".format(func.__qualname__))
+
+
+#Marker of asyncio.coroutine, whose debug mode wraps generators in a plain
+#function. Removed along with the decorator
+_is_coroutine = getattr(asyncio.coroutines, '_is_coroutine', None)
+
+
+def _is_coroutine_function(func):
+    """
+    Whether calling ``func`` returns an object that needs to be awaited
+    """
+    #Generator based coroutines from asyncio.coroutine or types.coroutine
+    return (inspect.iscoroutinefunction(func)
+            or inspect.isgeneratorfunction(func)
+            or (_is_coroutine is not None
+                and getattr(func, '_is_coroutine', None) is _is_coroutine))
+
 
 class EventHandler:
     """
@@ -314,102 +838,768 @@ class EventHandler:
 
     Parameters
     ----------
-    path : str
-        Filepath to PowerMate event stream
+    path : str or :class:`.Transport`
+        Filepath to PowerMate event stream, or a transport to communicate
+        over, e.g. a :class:`.PipeTransport` to run without hardware
 
     loop : ``asyncio.event_loop``, optional
         Optional existing event loop if you would like to integrate multiple
         async objects
+
+    reader : bool, optional
+        Register the device with ``loop.add_reader`` and only decode events
+        when the kernel reports data is ready, instead of polling the stream.
+        The transport must provide a file descriptor that supports ``select``,
+        e.g. an evdev node or pipe
+
+    coalesce : bool, optional
+        Sum consecutive rotations that are already buffered into a single call
+        of :meth:`.rotated`
+
+    window : float, optional
+        When coalescing, time in seconds to keep collecting rotations after
+        the first one before calling :meth:`.rotated`, e.g. ``0.016`` to
+        deliver rotations at roughly the frame rate of a display
+
+    frames : bool, optional
+        Collect events up to each ``SYN_REPORT`` and hand them to
+        :meth:`.on_frame` as a single :class:`.Frame`. Coalescing does not
+        apply in this mode
+
+    recorder : :class:`.Recorder`, optional
+        Record every event read from the PowerMate to a binary log. Any object
+        with ``record(events)`` and ``flush()`` methods can be used, buffered
+        events are flushed every ``flush_interval`` seconds if it defines one
+
+    reconnect : bool, optional
+        Instead of finishing the run when the PowerMate is disconnected, wait
+        for the device to reappear, reopen it and resume dispatch. The last
+        LED instruction is sent again to the reconnected device
+
+    led_rate : float, optional
+        Maximum number of LED instructions written per second. Instructions
+        returned faster than this are held back and only the most recent one
+        is written, see :class:`.LedOutput`
+
+    thread : bool, optional
+        Read and decode events in a dedicated thread that blocks on the
+        device, handing each batch to the event loop. Handlers are still
+        called from the loop. Reads no longer wait for the loop, so the device
+        is drained promptly even while other coroutines keep the loop busy.
+        Like ``reader``, the transport must provide a file descriptor
+
+    max_in_flight : int, optional
+        Run coroutine handlers as tasks instead of awaiting each one before
+        the next event, allowing up to this many to run at once. Events keep
+        being read and dispatched while handlers wait, e.g. on network I/O.
+        Handlers start in the order of their events and their results are
+        written to the PowerMate in the same order, so ``1`` runs handlers
+        one at a time without holding up the reading of the device
+
+    per_kind : bool, optional
+        Apply ``max_in_flight`` and the ordering of results to each handler
+        separately, so that slow calls of :meth:`.rotated` do not delay
+        :meth:`.pressed` or the writing of its result. Results of the same
+        handler are still written in the order of their events
+
+    executor : ``concurrent.futures.Executor``, optional
+        Executor running the handlers decorated with :func:`.offload` that do
+        not name their own. Combine with ``max_in_flight`` to run several
+        calls at once, e.g. on every core with a ``ProcessPoolExecutor`` for
+        handlers offloaded with ``bound=False``
+
+    queue_size : int, optional
+        Hold at most this many events read from the PowerMate awaiting
+        dispatch, see :class:`.EventQueue`. By default every event read is
+        queued
+
+    policy : str, optional
+        What to do with events that arrive while the queue is full, one of
+        ``'block'``, ``'drop-oldest'``, ``'drop-newest'`` or
+        ``'merge-rotations'``
+
+    on_high_water : callable, optional
+        Called with the number of queued events when the queue fills up
+
+    Attributes
+    ----------
+    stats : ``collections.Counter``
+        Number of ``events`` read from the PowerMate, calls of each handler,
+        responses ``written`` back to the PowerMate, LED instructions
+        ``suppressed`` as the LED already showed that state and
+        ``reconnects``
+
+    reconnect_times : list
+        Time in seconds from each disconnection until dispatch resumed
+
+    output : :class:`.LedOutput` or None
+        Rate limited output stage for LED instructions, if ``led_rate`` is set
+
+    queue : :class:`.EventQueue` or None
+        Bounded queue of events awaiting dispatch, if ``queue_size`` is set
+
+    Notes
+    -----
+    The handlers :meth:`.rotated`, :meth:`.pressed`, :meth:`.released` and
+    :meth:`.on_frame` can be defined with ``async def`` or as plain functions.
+    Plain functions are called directly, without creating a coroutine for each
+    event, which is preferable for handlers that only compute a response. The
+    choice is inspected once when the handler is created
     """
     #Default event size
     _event_size  = EVENT_SIZE
 
+    #User defined handlers
+    _handlers    = ('rotated', 'pressed', 'released', 'on_frame')
+
     #Internal State Variables
     _depressed   = None
     _rotation    = None
     _pressed     = False
 
-    def __init__(self, path, loop=None):
+    def __init__(self, path, loop=None, reader=False, coalesce=False,
+                 window=None, frames=False, recorder=None, reconnect=False,
+                 led_rate=None, thread=False, max_in_flight=None,
+                 per_kind=False, executor=None, queue_size=None,
+                 policy=BLOCK, on_high_water=None):
         #Create Source
-        self._source = Socket(path)
+        self.reader    = reader
+        self.coalesce  = coalesce
+        self.window    = window
+        self.frames    = frames
+        self.reconnect = reconnect
+        self.thread    = thread
+        self.max_in_flight = max_in_flight
+        self.per_kind      = per_kind
+        self.executor      = executor
+        #Fail early rather than on the first event
+        for name in self._handlers:
+            handler = getattr(type(self), name)
+            own, bound = getattr(handler, '_offload', (None, False))
+            if bound and own is None:
+                _check_unbound(handler, self.executor)
+        self._source = Socket(path, recorder=recorder)
         #Create asyncio event loop
         if loop is None:
             loop = asyncio.get_event_loop()
         self.loop = loop
         #Keep asyncio task to handle exceptions
         self._task = None
+        #Task of a run started by the async context manager
+        self._background = None
+        #Handler tasks in dispatch order, when dispatching concurrently,
+        #for each handler if per_kind is set
+        self._ordered = collections.defaultdict(collections.deque)
+        self._running = collections.Counter()
+        self._slot    = None
+        self._halt    = None
         self._response_stack = collections.deque([None])
+        #Events read from the device awaiting dispatch
+        self.queue = None
+        if queue_size:
+            self.queue = EventQueue(queue_size, policy=policy,
+                                    on_high_water=on_high_water)
+            self._events = self.queue
+        else:
+            self._events = collections.deque()
+        self._waiter = None
+        self._error  = None
+        self._flush_timer = None
+        #Whether events are being dispatched
+        self._serving = False
+        #Reading stops while a blocking queue is full
+        self._blocked   = False
+        self._listening = None
+        self._space     = threading.Event()
+        self._space.set()
+        #Events of the frame currently being collected
+        self._frame   = list()
+        self._dropped = False
+        #Check once which handlers need to be awaited
+        self._awaited = frozenset(
+                            name for name in self._handlers
+                            if _is_coroutine_function(getattr(self, name)))
+        self._frame_hook = type(self).on_frame is not EventHandler.on_frame
+        self.stats = collections.Counter()
+        self.reconnect_times = list()
+        #Optional rate limiting of LED instructions
+        self.output = None
+        if led_rate:
+            self.output = LedOutput(self._send, self.loop, led_rate)
+
+    async def _run(self):
+        try:
+            await self._serve()
+        finally:
+            logger.debug("Stopping the event loop")
+            self.loop.stop()
 
-    @asyncio.coroutine
-    def _run(self):
-        last_result = None
+    async def _serve(self):
+        """
+        Dispatch events until the run is stopped or the stream ends
+        """
+        self._serving = True
         try:
             logger.debug("Listening to event stream ...")
             while True:
-                yield from asyncio.sleep(0.0001, loop=self.loop)
-                #Stop the loop if requested via a user function
-                if last_result and last_result.type == EventType.STOP:
-                    logger.info("Received request to stop listening ...")
-                    raise StopIteration
-                #Send any responses from previous events back to stream
-                evt = self._source.stream.send(last_result)
-                last_result = None
-                #Process new events from stream
-                if evt:
-                    #On button event
-                    if evt.type == EventType.PUSH:
-                        t = (evt.tv_sec*10**3) + (evt.tv_usec*10**-3)
-                        #On press
-                        if evt.value:
-                            #Change internal state to pressed
-                            self._pressed   = True
-                            self._rotated   = False
-                            self._depressed = t
-                            #Trigger pressed coroutine
-                            last_result = yield from self.pressed()
-                        #On release
-                        else:
-                            #Change internal state to released
-                            self._pressed   = False
-                            if not self._depressed:
-                                logger.critical("Saw a release event "
-                                                "without a pressed event")
-                                elapsed = None
-                            #Store previous depressed time, and wipe away
-                            else:
-                                elapsed = t - self._depressed
-                                self._depressed = None
-                            #Trigger released coroutine
-                            last_result = yield from self.released(
-                                                     elapsed,
-                                                     rotated=self._rotated)
-                    #On rotation event
-                    elif evt.type == EventType.ROTATE:
-                        #Change internal state to rotated
-                        self._rotated = True
-                        #Trigger rotate coroutine
-                        last_result = yield from self.rotated(evt.value,
-                                                              pressed=self._pressed)
-                    #Ignore empty events 
-                    elif evt.type == EventType.NULL:
-                        pass
-                    #Bad event
+                try:
+                    if self.thread:
+                        await self._threaded()
+                    elif self.reader:
+                        await self._listen()
                     else:
-                        logger.warning("Unrecoginzed event %s", evt)
-                        raise EventNotImplemented(evt.__dict__)
-        #Stop received inside event loop
-        except StopIteration:
-            pass
+                        await self._poll()
+                    break
+                except ConnectionError:
+                    if not self.reconnect or self._source.path is None:
+                        raise
+                    await self._reconnect()
+            logger.info("Received request to stop listening ...")
+        #Finite event source played out
+        except EndOfStream:
+            logger.info("Reached the end of the event stream ...")
+            await self._settle()
         #External Keyboard stop
         except KeyboardInterrupt:
             print("Manual interruption of PowerMate run loop")
         #Cleanup
         finally:
-            logger.debug("Stopping the event loop")
-            self.loop.stop()
+            self._serving = False
+            #Handlers still running after the run has stopped
+            tasks = self._cancel_handlers()
+            if tasks:
+                await asyncio.wait(tasks)
+            #Write the final LED state held back by the output stage
+            if self.output:
+                try:
+                    self.output.flush()
+                except OSError:
+                    self.output.discard()
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._source.recorder:
+                self._source.recorder.flush()
+
+    async def _reconnect(self):
+        """
+        Wait for a disconnected PowerMate to return and reopen it
+        """
+        transport = self._source.transport
+        logger.warning("Lost connection to %s, waiting for the device ...",
+                       transport.path)
+        start = time.monotonic()
+        try:
+            transport.close()
+        except OSError:
+            pass
+        #Start watching before the first attempt so no change is missed
+        with DeviceWatcher(transport.path, loop=self.loop) as watcher:
+            while True:
+                try:
+                    transport = transport.reopen()
+                    break
+                except OSError:
+                    await watcher.wait()
+        #Continue with a fresh connection and button state
+        led = self._source.led
+        self._source = Socket(transport, recorder=self._source.recorder)
+        self._reset()
+        if led:
+            self._source.send(led)
+        elapsed = time.monotonic() - start
+        self.reconnect_times.append(elapsed)
+        self.stats['reconnects'] += 1
+        logger.info("Reconnected to %s after %.3f seconds",
+                    transport.path, elapsed)
+
+    async def _poll(self):
+        """
+        Repeatedly check the stream for new events
+        """
+        while True:
+            await asyncio.sleep(0.0001)
+            #Process every event the device has queued since the last check
+            self._read()
+            stop = await self._drain()
+            if stop:
+                return
+
+    async def _listen(self):
+        """
+        Dispatch events as the event loop reports the device is readable
+        """
+        fd = self._source.fileno()
+        self._listening = fd
+        self.loop.add_reader(fd, self._on_readable)
+        try:
+            await self._consume()
+        finally:
+            self._listening = None
+            self.loop.remove_reader(fd)
+
+    async def _threaded(self):
+        """
+        Dispatch events handed over by a thread reading the device
+        """
+        fd = self._source.fileno()
+        #Pipe used to wake the thread when the run is over
+        stop_read, stop_write = os.pipe()
+        thread = threading.Thread(target=self._read_thread,
+                                  args=(fd, stop_read), daemon=True,
+                                  name='PowerMate reader {}'.format(fd))
+        thread.start()
+        try:
+            await self._consume()
+        finally:
+            os.write(stop_write, b'\0')
+            self._space.set()
+            thread.join()
+            os.close(stop_read)
+            os.close(stop_write)
+
+    def _read_thread(self, fd, stop):
+        """
+        Block on the device outside of the event loop, handing each batch of
+        decoded events to the loop
+        """
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        poller.register(stop, select.POLLIN)
+        blocking = self.queue is not None and self.queue.policy == BLOCK
+        try:
+            while True:
+                ready = [_fd for _fd, mask in poller.poll()]
+                if stop in ready:
+                    return
+                #Leave events with the kernel while the queue is full
+                if not self._space.is_set():
+                    self._space.wait()
+                    continue
+                events = self._source.read()
+                if events:
+                    #Wait for the loop to queue each batch before the next
+                    if blocking:
+                        self._space.clear()
+                    self.loop.call_soon_threadsafe(self._deliver, events)
+        except Exception as exc:
+            self.loop.call_soon_threadsafe(self._fail, exc)
+
+    async def _consume(self):
+        """
+        Dispatch events as they are delivered to the handler
+        """
+        try:
+            while True:
+                #Sleep until the device has something for us
+                if not self._events:
+                    if self._error:
+                        raise self._error
+                    self._waiter = self.loop.create_future()
+                    await self._waiter
+                    self._waiter = None
+                stop = await self._drain()
+                if stop:
+                    return
+        finally:
+            self._waiter = None
+
+    async def _drain(self):
+        """
+        Dispatch every pending event, writing responses back to the PowerMate
+
+        Returns
+        -------
+        stop : bool
+            Whether a user function requested the run to stop
+        """
+        awaited    = self._awaited
+        concurrent = self.max_in_flight
+        while self._events and self._halt is None:
+            evt = self._events.popleft()
+            if self._blocked:
+                self._resume()
+            if self.frames:
+                frame = self._collect(evt)
+                #Wait for the rest of the frame
+                if not frame:
+                    continue
+                #Let the user handle the frame as a whole
+                if self._frame_hook:
+                    self.stats['on_frame'] += 1
+                    result = self.on_frame(frame)
+                    if concurrent:
+                        await self._submit('on_frame', result)
+                        continue
+                    if 'on_frame' in awaited:
+                        result = await result
+                    if self._respond(result):
+                        return True
+                    continue
+                evts = [e for e in (frame.push, frame.rotate) if e]
+            elif self.coalesce and evt.type == EventType.ROTATE:
+                evts = (await self._coalesce(evt),)
+            else:
+                evts = (evt,)
+            for evt in evts:
+                name, result = self._dispatch(evt)
+                if name:
+                    self.stats[name] += 1
+                if concurrent:
+                    await self._submit(name, result)
+                    continue
+                #Only coroutine handlers are awaited
+                if name in awaited:
+                    result = await result
+                if self._respond(result):
+                    return True
+        #Rotations combined by coalescing may have emptied the queue
+        if self._blocked:
+            self._resume()
+        #Stopped by a handler running concurrently
+        if self._halt is not None:
+            if self._halt is True:
+                return True
+            raise self._halt
+        return False
+
+    async def _submit(self, name, result):
+        """
+        Run a coroutine handler as a task, queueing its result to be written
+        after those of every earlier handler, or every earlier call of the
+        same handler if ``per_kind`` is set
+
+        Parameters
+        ----------
+        name : str or None
+            Name of the triggered handler
+
+        result : object
+            Response of the handler, a coroutine if it needs to be awaited
+        """
+        key     = name if self.per_kind else None
+        ordered = self._ordered[key]
+        if name in self._awaited:
+            #Wait for a free slot
+            while self._running[key] >= self.max_in_flight:
+                self._slot = self.loop.create_future()
+                await self._slot
+            #Stopped while waiting
+            if self._halt is not None:
+                result.close()
+                return
+            self._running[key] += 1
+            task = self.loop.create_task(result)
+            task.add_done_callback(functools.partial(self._finished, key))
+            ordered.append(task)
+        #Plain results wait behind the handlers still running
+        elif ordered:
+            future = self.loop.create_future()
+            future.set_result(result)
+            ordered.append(future)
+        elif self._respond(result):
+            self._halt = True
+
+    def _finished(self, key, task):
+        """
+        Callback for a completed handler task
+        """
+        self._running[key] -= 1
+        if self._slot and not self._slot.done():
+            self._slot.set_result(None)
+        #Write every result that is next in line
+        ordered = self._ordered[key]
+        while ordered and ordered[0].done():
+            future = ordered.popleft()
+            if future.cancelled():
+                continue
+            try:
+                stop = self._respond(future.result())
+            except Exception as exc:
+                self._halt_dispatch(exc)
+                return
+            if stop:
+                self._halt_dispatch(True)
+                return
+
+    def _halt_dispatch(self, reason):
+        """
+        Stop dispatching, either ``True`` when requested by a handler or the
+        exception raised by a handler task
+        """
+        self._halt = reason
+        self._cancel_handlers()
+        #Wake the handler so the run ends
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _cancel_handlers(self):
+        """
+        Cancel every handler task that is still running
+        """
+        tasks = [task for ordered in self._ordered.values()
+                 for task in ordered]
+        self._ordered.clear()
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    async def _settle(self):
+        """
+        Wait for the handler tasks still running and write their results
+        """
+        while self._halt is None:
+            tasks = [task for ordered in self._ordered.values()
+                     for task in ordered]
+            if not tasks:
+                break
+            await asyncio.wait(tasks)
+        if self._halt not in (None, True):
+            raise self._halt
+
+    def _respond(self, result):
+        """
+        Send the result of a handler back to the PowerMate
+
+        Parameters
+        ----------
+        result : :class:`.Event` or None
+            Value returned by the handler
+
+        Returns
+        -------
+        stop : bool
+            Whether the result requested the run to stop
+        """
+        #Stop the loop if requested via a user function
+        if result and result.type == EventType.STOP:
+            return True
+        #Send any responses back to the stream
+        if result:
+            if self.output and isinstance(result, LedEvent):
+                self.output.submit(result)
+            else:
+                self._send(result)
+        return False
+
+    def _send(self, evt):
+        """
+        Write an event to the PowerMate, unless it would not change the LED
 
-    @asyncio.coroutine
-    def rotated(self, value, pressed=False):
+        Returns
+        -------
+        written : bool
+        """
+        if self._source.send(evt):
+            self.stats['written'] += 1
+            return True
+        self.stats['suppressed'] += 1
+        return False
+
+    def _read(self):
+        """
+        Queue every event available from the PowerMate for dispatch
+        """
+        if not self._blocked:
+            self._deliver(self._source.read())
+
+    def _deliver(self, events):
+        """
+        Queue events for dispatch, waking the handler if it is waiting
+        """
+        self.stats['events'] += len(events)
+        self._events.extend(events)
+        #Make sure recorded events reach the disk even if the knob goes idle
+        recorder = self._source.recorder
+        if recorder and self._flush_timer is None:
+            interval = getattr(recorder, 'flush_interval', None)
+            if interval is not None:
+                self._flush_timer = self.loop.call_later(interval,
+                                                         self._flush_recorder)
+        if (self.queue is not None and self.queue.policy == BLOCK
+                and not self._blocked):
+            if self.queue.full:
+                self._pause()
+            else:
+                self._space.set()
+        if self._events and self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _flush_recorder(self):
+        """
+        Write the events buffered by the recorder to disk
+        """
+        self._flush_timer = None
+        self._source.recorder.flush()
+
+    def _pause(self):
+        """
+        Stop reading the PowerMate until the queue has been drained
+        """
+        logger.debug("Event queue is full, pausing reads ...")
+        self._blocked = True
+        self.queue.stats['blocked'] += 1
+        self._space.clear()
+        if self._listening is not None:
+            self.loop.remove_reader(self._listening)
+
+    def _resume(self):
+        """
+        Continue reading the PowerMate once half of the queue has been drained
+        """
+        if len(self._events) > self.queue.maxsize // 2:
+            return
+        logger.debug("Event queue drained, resuming reads ...")
+        self._blocked = False
+        self._space.set()
+        if self._listening is not None:
+            self.loop.add_reader(self._listening, self._on_readable)
+
+    def _fail(self, exc):
+        """
+        Report an error reading the device to the waiting handler
+        """
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_exception(exc)
+        else:
+            self._error = exc
+
+    def _collect(self, evt):
+        """
+        Add an event to the current frame
+
+        Parameters
+        ----------
+        evt : :class:`.Event`
+            Event received from the PowerMate
+
+        Returns
+        -------
+        frame : :class:`.Frame` or None
+            The completed frame if ``evt`` was a non-empty ``SYN_REPORT``
+        """
+        if evt.type != EventType.NULL:
+            if not self._dropped:
+                self._frame.append(evt)
+            return None
+        #The kernel buffer overflowed, discard up to the next SYN_REPORT
+        if evt.code == SYN_DROPPED:
+            logger.warning("Events dropped by the kernel, discarding frame")
+            self._frame   = list()
+            self._dropped = True
+            return None
+        if evt.code != SYN_REPORT:
+            return None
+        events, self._frame = self._frame, list()
+        if self._dropped:
+            self._dropped = False
+            return None
+        if events:
+            return Frame(events, evt)
+
+    async def _coalesce(self, evt):
+        """
+        Combine a rotation with the rotations buffered behind it
+
+        Parameters
+        ----------
+        evt : :class:`.Event`
+            First rotation event
+
+        Returns
+        -------
+        evt : :class:`.Event`
+            Rotation event with the summed value of every combined rotation
+        """
+        if self.window:
+            await asyncio.sleep(self.window)
+            #The reader callback or thread fills the buffer while we wait
+            if not (self.reader or self.thread):
+                self._read()
+        value = evt.value
+        last  = evt
+        #Rotations are separated by synchronization events
+        while self._events and self._events[0].type in (EventType.ROTATE,
+                                                         EventType.NULL):
+            nxt = self._events.popleft()
+            if nxt.type == EventType.ROTATE:
+                value += nxt.value
+                last   = nxt
+        if last is evt:
+            return evt
+        return Event(last.tv_sec, last.tv_usec, EventType.ROTATE,
+                     last.code, value)
+
+    def _on_readable(self):
+        """
+        Callback for the event loop when the device has data available
+        """
+        try:
+            self._read()
+        except Exception as exc:
+            #Stop watching a broken device and report to the listener
+            self.loop.remove_reader(self._source.fileno())
+            self._fail(exc)
+
+    def _dispatch(self, evt):
+        """
+        Update the internal state and trigger the handler for an event
+
+        Parameters
+        ----------
+        evt : :class:`.Event`
+            Event received from the PowerMate
+
+        Returns
+        -------
+        name : str or None
+            Name of the triggered handler
+
+        result : object
+            Response of the triggered handler, a coroutine if the handler was
+            defined with ``async def``
+        """
+        #On button event
+        if evt.type == EventType.PUSH:
+            t = (evt.tv_sec*10**3) + (evt.tv_usec*10**-3)
+            #On press
+            if evt.value:
+                #Change internal state to pressed
+                self._pressed   = True
+                self._rotated   = False
+                self._depressed = t
+                #Trigger pressed handler
+                return 'pressed', self.pressed()
+            #On release
+            else:
+                #Change internal state to released
+                self._pressed   = False
+                if not self._depressed:
+                    logger.critical("Saw a release event "
+                                    "without a pressed event")
+                    elapsed = None
+                #Store previous depressed time, and wipe away
+                else:
+                    elapsed = t - self._depressed
+                    self._depressed = None
+                #Trigger released handler
+                return 'released', self.released(elapsed,
+                                                 rotated=self._rotated)
+        #On rotation event
+        elif evt.type == EventType.ROTATE:
+            #Change internal state to rotated
+            self._rotated = True
+            #Trigger rotate handler
+            return 'rotated', self.rotated(evt.value, pressed=self._pressed)
+        #Ignore empty events
+        elif evt.type == EventType.NULL:
+            return None, None
+        #Bad event
+        else:
+            logger.warning("Unrecoginzed event %s", evt)
+            raise EventNotImplemented(evt)
+
+    async def rotated(self, value, pressed=False):
         """
         Desired response upon rotation
 
@@ -424,15 +1614,13 @@ class EventHandler:
         logger.debug('Powermate rotated %s while pressed : %s',
                      value, pressed)
 
-    @asyncio.coroutine
-    def pressed(self):
+    async def pressed(self):
         """
         Desired respsone upon button press
         """
         logger.debug('Powermate pressed')
 
-    @asyncio.coroutine
-    def released(self, time, rotated=False):
+    async def released(self, time, rotated=False):
         """
         Desired response upon button release
 
@@ -447,8 +1635,29 @@ class EventHandler:
         """
         logger.debug('Powermate released after %s ms', time)
 
-    @asyncio.coroutine
-    def stop(self):
+    async def on_frame(self, frame):
+        """
+        Desired response to a complete frame of events
+
+        Only used when the handler is created with ``frames=True``. By default
+        :meth:`.pressed` or :meth:`.released` are called for the button event
+        and :meth:`.rotated` once for the total rotation of the frame
+
+        Parameters
+        ----------
+        frame : :class:`.Frame`
+            Events received between two ``SYN_REPORT``
+        """
+        result = None
+        for evt in (frame.push, frame.rotate):
+            if evt:
+                name, ret = self._dispatch(evt)
+                if name in self._awaited:
+                    ret = await ret
+                result = ret or result
+        return result
+
+    async def stop(self):
         """
         Stop the current run
         """
@@ -458,10 +1667,73 @@ class EventHandler:
         """
         Clear all metadata from previous run
         """
-        self._task      = None
+        self._task = None
+        self._slot = None
+        self._halt = None
+        self._ordered.clear()
+        self._running.clear()
+        self._reset()
+
+    def _reset(self):
+        """
+        Forget the state of the button and any partially received events
+        """
         self._rotated   = False
         self._pressed   = False
         self._depressed = None
+        self._error     = None
+        self._frame     = list()
+        self._dropped   = False
+        self._events.clear()
+        self._blocked   = False
+        self._space.set()
+
+    def close(self):
+        """
+        Close the connection to the PowerMate
+        """
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def run_async(self):
+        """
+        Stream events within an event loop that is already running
+
+        The loop is neither started nor stopped, the coroutine simply returns
+        once the run has finished so the PowerMate can share the loop with
+        other services. The handler adopts the running loop if it was created
+        with another one
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            if self.output:
+                self.output.loop = loop
+        self._clear()
+        await self._serve()
+
+    async def __aenter__(self):
+        """
+        Run the handler in the background of the running event loop
+        """
+        self._background = asyncio.get_running_loop().create_task(
+                                                            self.run_async())
+        return self
+
+    async def __aexit__(self, *exc):
+        task, self._background = self._background, None
+        #Stop the run if it has not finished by itself
+        if not task.done():
+            task.cancel()
+        await asyncio.wait([task])
+        #Report a failed run, unless the block raised its own exception
+        if exc[0] is None and not task.cancelled() and task.exception():
+            raise task.exception()
 
     def __call__(self):
         #Clear all metadata from previous runs
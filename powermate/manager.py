@@ -0,0 +1,199 @@
+"""
+A :class:`.PowerMateManager` serves many PowerMates from a single process.
+Every device keeps its own :class:`.EventHandler` instance, but all of them
+share one event loop, so handlers created with ``reader=True`` are all
+registered with the same selector and the process sleeps until any device has
+events to report.
+
+.. code::
+
+    loop = asyncio.get_event_loop()
+    manager = PowerMateManager(loop=loop)
+    for path in ('/dev/input/event3', '/dev/input/event4'):
+        manager.add(MyPowerMate(path, loop=loop, reader=True))
+    manager.run()
+"""
+##############
+#  Standard  #
+##############
+import asyncio
+import logging
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+from . import discovery
+
+logger = logging.getLogger(__name__)
+
+
+class PowerMateManager:
+    """
+    Run the handlers of many PowerMates on a single event loop
+
+    Each handler is served independently, a handler that stops or fails does
+    not interrupt the others. The run finishes once every handler has stopped
+
+    Parameters
+    ----------
+    loop : ``asyncio.event_loop``, optional
+        Event loop shared by every handler
+
+    Attributes
+    ----------
+    handlers : dict
+        Registered handlers keyed by name
+
+    errors : dict
+        Exception that ended each failed handler, keyed by name
+    """
+    def __init__(self, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self.loop     = loop
+        self.handlers = dict()
+        self.errors   = dict()
+        self._tasks   = dict()
+        self._serving = False
+
+    def add(self, handler, name=None):
+        """
+        Register the handler of a PowerMate
+
+        Handlers added while the manager is running start immediately
+
+        Parameters
+        ----------
+        handler : :class:`.EventHandler`
+            Handler created with the event loop of the manager. Handlers
+            created with ``reader=True`` share the selector of the loop, others
+            poll their device
+
+        name : str, optional
+            Name used to report on the device, by default the device path
+
+        Returns
+        -------
+        handler : :class:`.EventHandler`
+        """
+        if handler.loop is not self.loop:
+            raise ValueError("Handler must use the event loop of the manager")
+        if name is None:
+            name = handler._source.path or repr(handler._source.transport)
+        if name in self.handlers:
+            raise ValueError("A PowerMate named {!r} is already registered"
+                             "".format(name))
+        if not handler.reader:
+            logger.warning("PowerMate %s will poll its device", name)
+        self.handlers[name] = handler
+        if self._serving:
+            self._start(name)
+        return handler
+
+    def discover(self, handler, **kwargs):
+        """
+        Register a handler for every connected PowerMate not yet served
+
+        Parameters
+        ----------
+        handler : type
+            Subclass of :class:`.EventHandler` to create for each device
+
+        kwargs :
+            Passed to the constructor, ``reader=True`` unless given
+
+        Returns
+        -------
+        handlers : list
+            Newly registered handlers
+        """
+        kwargs.setdefault('reader', True)
+        return [self.add(handler(path, loop=self.loop, **kwargs))
+                for path in discovery.discover()
+                if path not in self.handlers]
+
+    def remove(self, name):
+        """
+        Stop serving a PowerMate and forget its handler
+
+        Parameters
+        ----------
+        name : str
+            Name of the PowerMate
+
+        Returns
+        -------
+        handler : :class:`.EventHandler`
+        """
+        task = self._tasks.get(name)
+        if task:
+            task.cancel()
+        return self.handlers.pop(name)
+
+    def stats(self):
+        """
+        Report on every registered PowerMate
+
+        Returns
+        -------
+        stats : dict
+            Counts from :attr:`.EventHandler.stats` for each device along with
+            whether it is ``running`` and the ``error`` that ended it, if any
+        """
+        return dict((name, dict(handler.stats,
+                                running=name in self._tasks,
+                                error=self.errors.get(name)))
+                    for name, handler in self.handlers.items())
+
+    async def serve(self):
+        """
+        Serve every registered PowerMate until all of them have stopped
+        """
+        self._serving = True
+        try:
+            for name in self.handlers:
+                self._start(name)
+            while self._tasks:
+                await asyncio.wait(list(self._tasks.values()))
+        finally:
+            self._serving = False
+            for task in self._tasks.values():
+                task.cancel()
+
+    def stop(self):
+        """
+        Stop serving every PowerMate
+        """
+        for task in self._tasks.values():
+            task.cancel()
+
+    def run(self):
+        """
+        Serve every registered PowerMate, blocking until all have stopped
+        """
+        self.loop.run_until_complete(self.serve())
+
+    __call__ = run
+
+    def _start(self, name):
+        self._tasks[name] = self.loop.create_task(self._supervise(name))
+
+    async def _supervise(self, name):
+        """
+        Serve a single PowerMate, keeping its failure to itself
+        """
+        self.errors.pop(name, None)
+        try:
+            await self.handlers[name].run_async()
+        except Exception as exc:
+            logger.exception("PowerMate %s failed", name)
+            self.errors[name] = exc
+        finally:
+            self._tasks.pop(name, None)
+
+    def __repr__(self):
+        return '<PowerMateManager ({} devices)>'.format(len(self.handlers))
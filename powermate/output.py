@@ -0,0 +1,114 @@
+"""
+Rate limiting of the LED instructions sent to a PowerMate. Spinning the dial
+can produce hundreds of brightness changes a second, more than the device, or
+the eye, can resolve. An :class:`.LedOutput` writes the first instruction
+immediately, then holds back only the most recent instruction until the next
+write is allowed, dropping the states in between.
+"""
+##############
+#  Standard  #
+##############
+import logging
+import collections
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+
+logger = logging.getLogger(__name__)
+
+
+class LedOutput:
+    """
+    Latest-wins output stage for LED instructions
+
+    Parameters
+    ----------
+    write : callable
+        Called with each :class:`.LedEvent` that is sent to the device,
+        returning ``False`` if the instruction was not written as the LED
+        already showed that state
+
+    loop : ``asyncio.event_loop``
+        Event loop used to schedule held back writes
+
+    rate : float
+        Maximum number of writes per second
+
+    Attributes
+    ----------
+    stats : ``collections.Counter``
+        Number of instructions ``submitted``, ``written`` to the device,
+        ``dropped`` in favor of a later instruction and ``suppressed`` as they
+        matched the state of the LED
+    """
+    def __init__(self, write, loop, rate):
+        self.write    = write
+        self.loop     = loop
+        self.interval = 1. / rate
+        self.stats    = collections.Counter()
+        self.pending  = None
+        self._last    = None
+        self._timer   = None
+
+    def submit(self, led):
+        """
+        Send an LED instruction as soon as the rate allows
+
+        Parameters
+        ----------
+        led : :class:`.LedEvent`
+        """
+        self.stats['submitted'] += 1
+        #Replace the instruction waiting for the next slot
+        if self.pending is not None:
+            self.stats['dropped'] += 1
+            self.pending = led
+            return
+        now = self.loop.time()
+        if self._last is None or now - self._last >= self.interval:
+            self._write(led, now)
+        else:
+            self.pending = led
+            self._timer = self.loop.call_at(self._last + self.interval,
+                                            self._due)
+
+    def flush(self):
+        """
+        Write the held back instruction immediately
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self.pending is not None:
+            led, self.pending = self.pending, None
+            self._write(led, self.loop.time())
+
+    def discard(self):
+        """
+        Drop the held back instruction
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.pending = None
+
+    def _due(self):
+        self._timer = None
+        try:
+            self.flush()
+        #A lost device is reported by the next read
+        except OSError as exc:
+            logger.warning("Unable to write LED instruction: %s", exc)
+
+    def _write(self, led, now):
+        #Unchanged states do not use up the rate
+        if self.write(led) is False:
+            self.stats['suppressed'] += 1
+            return
+        self._last = now
+        self.stats['written'] += 1
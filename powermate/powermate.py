@@ -1,14 +1,14 @@
 """
 PowerMateBase is the main driver for the powermate library. The class is built
 on top of the :class:`.EventHandler` to stream events from the PowerMate USB
-connection into asyncio.coroutine functions. By taking this base class, and
-using it as a parent of a more complex, application specific PowerMate class you
-can easily map PowerMate actions into Python functions.
+connection into ``async def`` coroutine functions. By taking this base class,
+and using it as a parent of a more complex, application specific PowerMate
+class you can easily map PowerMate actions into Python functions.
 
 The main functions a wrapper can reimplement are :meth:`.on_start`,
 :meth:`.on_exit`, :meth:`.rotated`, :meth:`.pressed`, and :meth:`.released`
-Please note which of these are ``@asyncio.coroutine`` functions as they will
-need to have that wrap to be called properly in the event loop.
+Please note which of these are coroutines as they will need to be defined
+with ``async def`` to be called properly in the event loop.
 
 When these functions are called while the event loop is running, the return
 values are stored, converted to binary and sent back to the PowerMate. This
@@ -28,7 +28,9 @@ are already available as class methods of :class:`.LedEvent` and
 ##############
 #   Module   #
 ##############
-from .event  import LedEvent, EventHandler
+from .           import discovery
+from .event      import LedEvent, EventHandler
+from .errors     import DeviceNotFound
 
 class PowerMateBase(EventHandler):
     """
@@ -53,6 +55,37 @@ class PowerMateBase(EventHandler):
         Optional existing event loop if you would like to integrate multiple
         async objects
     """
+    @classmethod
+    def discover(cls, index=0, **kwargs):
+        """
+        Create a PowerMate for a connected device
+
+        Parameters
+        ----------
+        index : int, optional
+            Position of the device among those found by
+            :func:`.discovery.discover`, ordered by event node
+
+        kwargs :
+            Passed to the constructor
+
+        Returns
+        -------
+        powermate : :class:`.PowerMateBase`
+
+        Raises
+        ------
+        DeviceNotFound
+            If there are not enough PowerMates connected
+        """
+        paths = discovery.discover()
+        try:
+            path = paths[index]
+        except IndexError:
+            raise DeviceNotFound("Found {} PowerMates, unable to use device {}"
+                                 "".format(len(paths), index)) from None
+        return cls(path, **kwargs)
+
     def on_start(self):
         """
         Method to be called prior to thestart of thedevent loop
@@ -65,35 +98,51 @@ class PowerMateBase(EventHandler):
         """
         pass
 
-    def pulse(self):
+    def pulse(self, force=False):
         """
         Pulse the LED on the bottom of the PowerMate
         
-        If the loop is running this simply returns an LedEvent, otherwise
-        this handles writing the Event into the stream
+        While events are being dispatched this simply returns an LedEvent to
+        be written as the response of a handler, otherwise this handles
+        writing the Event into the stream, e.g. from :meth:`.on_exit`
+
+        Parameters
+        ----------
+        force : bool, optional
+            Write the instruction even if the LED is believed to be pulsing
+            already, e.g. after the device was reset by another program
         """
         evt = LedEvent.pulse()
-        #Don't send the event while loop is running
-        if not self.loop.is_running():
+        if force:
+            self._source.led = None
+        #Don't send the event while dispatching events
+        if not self._serving:
             self._source.send(evt)
         return evt
 
-    def illuminate(self, percent=100):
+    def illuminate(self, percent=100, force=False):
         """
         Illuminate the LED on the bottom of the PowerMate
         
-        If the loop is running this simply returns an LedEvent, otherwise
-        this handles writing the Event into the stream
+        While events are being dispatched this simply returns an LedEvent to
+        be written as the response of a handler, otherwise this handles
+        writing the Event into the stream, e.g. from :meth:`.on_exit`
 
         Parameters
         ----------
         brightness : float, optional
             Percentage of maximum brightness to set the LED. By default, this
             is 1., setting the LED to the brightest possible setting
+
+        force : bool, optional
+            Write the instruction even if the LED is believed to show this
+            brightness already
         """
         evt = LedEvent.percent(percent)
-        #Don't send the event while loop is running
-        if not self.loop.is_running():
+        if force:
+            self._source.led = None
+        #Don't send the event while dispatching events
+        if not self._serving:
             self._source.send(evt)
         return evt
 
@@ -107,5 +156,20 @@ class PowerMateBase(EventHandler):
 
     __call__ = run
 
+    async def run_async(self):
+        """
+        Stream events from the PowerMate within a running event loop
+
+        :meth:`.on_exit` is called however the run ends, including when it is
+        cancelled by leaving an ``async with`` block or by a
+        :class:`.PowerMateManager`
+        """
+        self.on_start()
+        try:
+            await super().run_async()
+        #Clean up even if the run is cancelled
+        finally:
+            self.on_exit()
+
     def __repr__(self):
         return '<Griffin PowerMate ({})>'.format(self._source.path)
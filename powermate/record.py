@@ -0,0 +1,322 @@
+"""
+Recording of the events received from a PowerMate. A :class:`.Recorder` can be
+attached to a :class:`.Socket`, or passed to an :class:`.EventHandler`, to tee
+every decoded event into an append-only binary log that can later be read back
+with :func:`.read_log`, e.g. to replay a production session through a
+:class:`.ReplayTransport`.
+
+For replaying large sessions, events can be stored in a raw capture with
+:func:`.write_capture`. A :class:`.CaptureReplay` memory-maps the capture and
+feeds it through the normal dispatch path, in real time, faster than real time
+or as fast as the handler can keep up.
+
+Log Format
+----------
+The file starts with the ``LOG_MAGIC`` header followed by one record per
+event. Each record is four unsigned LEB128 varints::
+
+    type  code  zigzag(value)  zigzag(timestamp delta)
+
+The timestamp delta is measured in microseconds from the previous record, or
+from zero for the first record of a session. Every session appended to an
+existing log starts with a single ``LOG_RESET`` varint in place of a type.
+
+Capture Format
+--------------
+A capture is the ``CAPTURE_HEADER``, holding ``CAPTURE_MAGIC`` and the size of
+a single event, followed by the events packed with ``EVENT_FORMAT`` exactly as
+they are read from the device.
+"""
+##############
+#  Standard  #
+##############
+import os
+import mmap
+import time
+import struct
+import logging
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+from .event     import Event, _event_types, EVENT_STRUCT, EVENT_SIZE
+from .errors    import EndOfStream
+from .transport import ReplayTransport
+
+logger = logging.getLogger(__name__)
+
+LOG_MAGIC = b'PMLOG\x01'
+#Marker in place of an event type that restarts the timestamp deltas
+LOG_RESET = 0x7f
+
+CAPTURE_MAGIC  = b'PMCAP\x01'
+CAPTURE_HEADER = struct.Struct('<6sH')
+
+
+def _zigzag(n):
+    """
+    Map a signed integer onto an unsigned integer, keeping small values small
+    """
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _varint(n, out):
+    """
+    Append ``n`` to the bytearray ``out`` as an unsigned LEB128 varint
+    """
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+class Recorder:
+    """
+    Append-only binary log of PowerMate events
+
+    Encoded events are collected by a buffered writer, so recording does not
+    add a system call per event. The buffer is written to disk when it is full
+    and, when the recorder belongs to a running :class:`.EventHandler`, no
+    later than ``flush_interval`` seconds after events are recorded. Used on
+    its own the buffer is only written out when a later call of
+    :meth:`.record` finds ``flush_interval`` has passed, or on :meth:`.flush`
+
+    Parameters
+    ----------
+    path : str
+        Filepath of the log, new sessions are appended to an existing log
+
+    flush_interval : float, optional
+        Maximum time in seconds between writes of the buffer to disk
+
+    buffer_size : int, optional
+        Size in bytes of the write buffer
+
+    Attributes
+    ----------
+    count : int
+        Number of events recorded in this session
+    """
+    def __init__(self, path, flush_interval=1., buffer_size=65536):
+        self.path  = path
+        self.count = 0
+        self.flush_interval = flush_interval
+        new = not os.path.exists(path) or not os.path.getsize(path)
+        self._file = open(path, 'ab', buffering=buffer_size)
+        if new:
+            self._file.write(LOG_MAGIC)
+        else:
+            self._file.write(bytes([LOG_RESET]))
+        self._last    = 0
+        self._flushed = time.monotonic()
+
+    def record(self, events):
+        """
+        Add events to the log
+
+        Parameters
+        ----------
+        events : iterable
+            Sequence of :class:`.Event` to record
+        """
+        out  = bytearray()
+        last = self._last
+        for evt in events:
+            stamp = evt.tv_sec * 1000000 + evt.tv_usec
+            _varint(evt.type.value, out)
+            _varint(evt.code, out)
+            _varint(_zigzag(evt.value), out)
+            _varint(_zigzag(stamp - last), out)
+            last = stamp
+            self.count += 1
+        self._last = last
+        self._file.write(out)
+        #Periodically push the buffer to disk
+        now = time.monotonic()
+        if now - self._flushed >= self.flush_interval:
+            self._file.flush()
+            self._flushed = now
+
+    def flush(self):
+        """
+        Write all buffered events to disk
+        """
+        self._file.flush()
+        self._flushed = time.monotonic()
+
+    def close(self):
+        """
+        Flush and close the log
+        """
+        if not self._file.closed:
+            self._file.close()
+        logger.debug("Recorded %s events to %s", self.count, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log(path):
+    """
+    Read back the events of a log written by a :class:`.Recorder`
+
+    Parameters
+    ----------
+    path : str
+        Filepath of the log
+
+    Returns
+    -------
+    events : generator
+        Every recorded :class:`.Event`, in order
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(LOG_MAGIC):
+        raise ValueError('{} is not a PowerMate log'.format(path))
+    pos, end = len(LOG_MAGIC), len(data)
+    fields = list()
+    last   = 0
+    while pos < end:
+        #Decode a single varint
+        n, shift = 0, 0
+        while True:
+            byte   = data[pos]
+            pos   += 1
+            n     |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        #Session boundary
+        if not fields and n == LOG_RESET:
+            last = 0
+            continue
+        fields.append(n)
+        if len(fields) == 4:
+            _type, code, value, delta = fields
+            fields = list()
+            last += _unzigzag(delta)
+            _type = _event_types.get(_type)
+            if _type is None:
+                logger.critical('Unrecognized event value')
+                continue
+            yield Event(last // 1000000, last % 1000000, _type, code,
+                        _unzigzag(value))
+    if fields:
+        logger.warning("Log %s ends with a truncated record", path)
+
+
+def write_capture(path, events):
+    """
+    Write events to a raw capture
+
+    Parameters
+    ----------
+    path : str
+        Filepath of the capture, overwritten if it exists
+
+    events : iterable
+        :class:`.Event` objects to store, e.g. from :func:`.read_log`
+
+    Returns
+    -------
+    count : int
+        Number of events written
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, EVENT_SIZE))
+        for evt in events:
+            f.write(evt.raw)
+            count += 1
+    return count
+
+
+class CaptureReplay(ReplayTransport):
+    """
+    Replay of a raw capture read through a memory map
+
+    Only the pages being replayed are loaded, so captures larger than the
+    available memory can be played back. Like any :class:`.ReplayTransport`
+    the replay raises :class:`.EndOfStream` once every event has been read
+
+    Parameters
+    ----------
+    path : str
+        Filepath of a capture written by :func:`.write_capture`
+
+    speed : float, optional
+        Playback rate relative to the timestamps of the capture, ``1`` replays
+        in real time and ``10`` ten times faster. By default events are
+        released as fast as they are read
+
+    chunk : int, optional
+        Maximum number of bytes returned by a single read, at least the size
+        of a single event
+    """
+    def __init__(self, path, speed=None, chunk=None):
+        #Timed playback only releases whole events
+        if chunk is not None and chunk < EVENT_SIZE:
+            raise ValueError('Replay must read at least {} bytes at a time'
+                             ''.format(EVENT_SIZE))
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, size = CAPTURE_HEADER.unpack_from(self._mmap)
+        except struct.error:
+            magic, size = None, None
+        if magic != CAPTURE_MAGIC or size != EVENT_SIZE:
+            self._mmap.close()
+            raise ValueError('{} is not a capture of {} byte events'
+                             ''.format(path, EVENT_SIZE))
+        super().__init__(memoryview(self._mmap)[CAPTURE_HEADER.size:],
+                         chunk=chunk)
+        self.speed   = speed
+        self._start  = None
+        self._origin = None
+
+    def __len__(self):
+        return len(self._data) // EVENT_SIZE
+
+    def _stamp(self, offset):
+        tv_sec, tv_usec = EVENT_STRUCT.unpack_from(self._data, offset)[:2]
+        return tv_sec + tv_usec * 1e-6
+
+    def readinto(self, buffer):
+        if not self.speed:
+            return super().readinto(buffer)
+        remaining = len(self._data) - self._offset
+        if not remaining:
+            raise EndOfStream('Replay finished')
+        #Playback clock starts with the first read
+        now = time.monotonic()
+        if self._start is None:
+            self._start  = now
+            self._origin = self._stamp(self._offset)
+        due = self._origin + (now - self._start) * self.speed
+        #Release every whole event whose time has come
+        limit = min(len(buffer) - len(buffer) % EVENT_SIZE, remaining)
+        if self.chunk:
+            limit = min(limit, self.chunk - self.chunk % EVENT_SIZE)
+        n = 0
+        while n < limit and self._stamp(self._offset + n) <= due:
+            n += EVENT_SIZE
+        buffer[:n] = self._data[self._offset:self._offset+n]
+        self._offset += n
+        return n
+
+    def close(self):
+        super().close()
+        self._mmap.close()
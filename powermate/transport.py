@@ -0,0 +1,364 @@
+"""
+Transports carry the raw binary between a :class:`.Socket` and the PowerMate.
+The :class:`.DeviceTransport` talks to the evdev file of a real device, while
+the remaining implementations allow the full dispatch loop to be driven
+without hardware; :class:`.PipeTransport` and :class:`.SocketPairTransport`
+present a real file descriptor that can be watched by the event loop, and
+:class:`.ReplayTransport` plays back an in-memory buffer of events.
+
+Every transport follows the same small interface. :meth:`.Transport.readinto`
+fills a buffer with whatever bytes are available, returning ``0`` when there
+is nothing to read yet and raising ``ConnectionError`` when the device is gone.
+:meth:`.Transport.write` sends an encoded event to the device.
+"""
+##############
+#  Standard  #
+##############
+import io
+import os
+import errno
+import socket
+import weakref
+import logging
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+from .errors import EndOfStream
+
+logger = logging.getLogger(__name__)
+
+
+class Transport:
+    """
+    Base class for a connection to a PowerMate
+
+    Attributes
+    ----------
+    path : str or None
+        Location of the device, if any
+    """
+    path = None
+
+    def fileno(self):
+        """
+        File descriptor that becomes readable when events are available
+        """
+        raise io.UnsupportedOperation('{} has no file descriptor'
+                                      ''.format(self.__class__.__name__))
+
+    def readinto(self, buffer):
+        """
+        Read available bytes from the device
+
+        Parameters
+        ----------
+        buffer : writable bytes-like
+            Destination of the read
+
+        Returns
+        -------
+        n : int
+            Number of bytes read, ``0`` if nothing is available
+        """
+        raise NotImplementedError
+
+    def write(self, data):
+        """
+        Write encoded events to the device
+
+        Parameters
+        ----------
+        data : bytes
+            Binary to send
+        """
+        raise NotImplementedError
+
+    def reopen(self):
+        """
+        Open a new connection to the same device after a disconnection
+
+        Returns
+        -------
+        transport : :class:`.Transport`
+
+        Raises
+        ------
+        OSError
+            If the device is not available yet
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release the resources held by the transport
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.path)
+
+
+class DeviceTransport(Transport):
+    """
+    Transport for the evdev file of a connected PowerMate
+
+    A single raw file descriptor, opened with ``O_RDWR | O_NONBLOCK``, is
+    used for both reading events and writing LED instructions, so nothing is
+    buffered and writes need no flush. Reads never block, returning ``0`` when
+    the kernel has no events queued
+
+    Parameters
+    ----------
+    path : str
+        Filepath to Powermate USB
+    """
+    def __init__(self, path):
+        self.path = path
+        self._fd  = os.open(path, os.O_RDWR | os.O_NONBLOCK | os.O_CLOEXEC)
+        #Close the descriptor of a transport dropped without close()
+        self._finalizer = weakref.finalize(self, os.close, self._fd)
+
+    @property
+    def closed(self):
+        """
+        Whether the file descriptor has been closed
+        """
+        return self._fd is None
+
+    def fileno(self):
+        if self._fd is None:
+            raise ValueError('I/O operation on closed device')
+        return self._fd
+
+    def readinto(self, buffer):
+        try:
+            n = os.readv(self.fileno(), [buffer])
+        #Nothing available
+        except BlockingIOError:
+            return 0
+        except OSError as e:
+            if e.errno == errno.ENODEV:
+                raise ConnectionError('PowerMate disconnected') from e
+            raise
+        if not n:
+            raise ConnectionError('PowerMate disconnected')
+        return n
+
+    def write(self, data):
+        try:
+            os.write(self.fileno(), data)
+        except OSError as e:
+            if e.errno == errno.ENODEV:
+                raise ConnectionError('PowerMate disconnected') from e
+            raise
+
+    def reopen(self):
+        return type(self)(self.path)
+
+    def close(self):
+        if self._fd is not None:
+            self._fd = None
+            self._finalizer()
+
+
+class PipeTransport(Transport):
+    """
+    Transport over a pair of pipes
+
+    One pipe carries events from the simulated device, the other carries the
+    events written back by the handler. Reads never block, so the transport
+    can be used both by the polling loop and with ``reader=True``. The device
+    side must consume the written events to keep the pipe from filling
+    """
+    def __init__(self):
+        self._read, self._inject = os.pipe()
+        self._received, self._write = os.pipe()
+        os.set_blocking(self._read, False)
+        os.set_blocking(self._received, False)
+
+    def fileno(self):
+        return self._read
+
+    def readinto(self, buffer):
+        try:
+            n = os.readv(self._read, [buffer])
+        except BlockingIOError:
+            return 0
+        #Writer has closed its end
+        if not n:
+            raise ConnectionError('PowerMate disconnected')
+        return n
+
+    def write(self, data):
+        os.write(self._write, data)
+
+    def peer_fileno(self):
+        """
+        File descriptor the device side receives written events on
+        """
+        return self._received
+
+    def inject(self, data):
+        """
+        Send binary to the handler as if it came from the device
+        """
+        os.write(self._inject, data)
+
+    def received(self):
+        """
+        Every byte written by the handler since the last call
+        """
+        chunks = list()
+        while True:
+            try:
+                chunk = os.read(self._received, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def disconnect(self):
+        """
+        Close the device side of the pipe, simulating an unplugged device
+        """
+        if self._inject is not None:
+            os.close(self._inject)
+            self._inject = None
+
+    def close(self):
+        self.disconnect()
+        if self._read is None:
+            return
+        for fd in (self._read, self._received, self._write):
+            os.close(fd)
+        self._read = self._received = self._write = None
+
+
+class SocketPairTransport(Transport):
+    """
+    Transport over a connected pair of Unix sockets
+
+    Behaves like :class:`.PipeTransport` but uses a single bidirectional
+    socket for each side. The :attr:`.peer` socket is the device side
+    """
+    def __init__(self):
+        self._sock, self.peer = socket.socketpair()
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def readinto(self, buffer):
+        try:
+            n = self._sock.recv_into(buffer, 0, socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            return 0
+        #Peer has shut down its side
+        if not n:
+            raise ConnectionError('PowerMate disconnected')
+        return n
+
+    def write(self, data):
+        self._sock.sendall(data)
+
+    def peer_fileno(self):
+        """
+        File descriptor the device side receives written events on
+        """
+        return self.peer.fileno()
+
+    def inject(self, data):
+        """
+        Send binary to the handler as if it came from the device
+        """
+        self.peer.sendall(data)
+
+    def received(self):
+        """
+        Every byte written by the handler since the last call
+        """
+        chunks = list()
+        while True:
+            try:
+                chunk = self.peer.recv(65536, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def disconnect(self):
+        """
+        Shut down the device side, simulating an unplugged device
+        """
+        self.peer.shutdown(socket.SHUT_WR)
+
+    def close(self):
+        self._sock.close()
+        self.peer.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport playing back an in-memory buffer of events
+
+    Once every event has been read :class:`.EndOfStream` is raised, which
+    finishes the run of an :class:`.EventHandler` cleanly. There is no file
+    descriptor, so the transport can only be used by the polling loop
+
+    Parameters
+    ----------
+    data : bytes-like
+        Packed events to play back
+
+    chunk : int, optional
+        Maximum number of bytes returned by a single read, by default as many
+        as fit in the buffer of the reader
+
+    Attributes
+    ----------
+    written : bytearray
+        Every byte written to the transport
+    """
+    def __init__(self, data, chunk=None):
+        self._data    = memoryview(data)
+        self._offset  = 0
+        self.chunk    = chunk
+        self.written  = bytearray()
+
+    @classmethod
+    def from_events(cls, events, **kwargs):
+        """
+        Create a replay of a sequence of :class:`.Event`
+        """
+        return cls(b''.join(evt.raw for evt in events), **kwargs)
+
+    def readinto(self, buffer):
+        remaining = len(self._data) - self._offset
+        if not remaining:
+            raise EndOfStream('Replay finished')
+        n = min(len(buffer), remaining)
+        if self.chunk:
+            n = min(n, self.chunk)
+        buffer[:n] = self._data[self._offset:self._offset+n]
+        self._offset += n
+        return n
+
+    def write(self, data):
+        self.written.extend(data)
+
+    def close(self):
+        self._data.release()
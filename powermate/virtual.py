@@ -0,0 +1,235 @@
+"""
+A :class:`.VirtualPowerMate` simulates the device side of a PowerMate so that
+handlers can be exercised without hardware. Events are packed with
+``EVENT_FORMAT`` and written to a pipe, exactly as the kernel would present
+them, and the LED instructions sent back by the handler are collected for
+inspection.
+
+.. code::
+
+    loop = asyncio.get_event_loop()
+    device = VirtualPowerMate(loop=loop)
+    handler = MyPowerMate(device, loop=loop, reader=True)
+    device.click()
+    loop.run_until_complete(device.spin(10000, rate=20000))
+"""
+##############
+#  Standard  #
+##############
+import os
+import time
+import asyncio
+import logging
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+from .event     import Event, LedEvent, EventType, MSC_PULSELED, EVENT_SIZE
+from .transport import PipeTransport
+
+logger = logging.getLogger(__name__)
+
+#Button and dial codes reported by the PowerMate
+BTN_0    = 0x100
+REL_DIAL = 0x07
+
+
+class VirtualPowerMate(PipeTransport):
+    """
+    Scriptable PowerMate presented over a pipe
+
+    Every scripted action is terminated by a ``SYN_REPORT`` like those sent by
+    the kernel. Writes never block, events that do not fit in the pipe are
+    held back and sent as the event loop reports that the handler has made
+    room, so bursts larger than the pipe can be scripted from inside the loop
+
+    Parameters
+    ----------
+    loop : ``asyncio.event_loop``, optional
+        Event loop running the handler, used to send held back events and to
+        collect LED instructions as they are written
+
+    Attributes
+    ----------
+    sent : int
+        Number of events sent to the handler, not including ``SYN_REPORT``
+    """
+    def __init__(self, loop=None):
+        super().__init__()
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self.loop     = loop
+        self.sent     = 0
+        self._leds    = list()
+        self._outbox  = bytearray()
+        self._partial = bytearray()
+        self._writing = False
+        self._drained = None
+        os.set_blocking(self._inject, False)
+        self.loop.add_reader(self._received, self.collect)
+
+    @property
+    def leds(self):
+        """
+        Every :class:`.LedEvent` written by the handler
+        """
+        self.collect()
+        return self._leds
+
+    @property
+    def led(self):
+        """
+        Last LED instruction written by the handler, ``None`` if there is none
+        """
+        leds = self.leds
+        return leds[-1] if leds else None
+
+    def press(self):
+        """
+        Press the button
+        """
+        self._send([(EventType.PUSH, BTN_0, 1)])
+
+    def release(self):
+        """
+        Release the button
+        """
+        self._send([(EventType.PUSH, BTN_0, 0)])
+
+    def click(self):
+        """
+        Press and release the button
+        """
+        self._send([(EventType.PUSH, BTN_0, 1), (EventType.PUSH, BTN_0, 0)])
+
+    def rotate(self, detents=1):
+        """
+        Turn the dial, one event per detent
+
+        Parameters
+        ----------
+        detents : int, optional
+            Number of detents, negative values turn counter-clockwise
+        """
+        step = 1 if detents > 0 else -1
+        self._send([(EventType.ROTATE, REL_DIAL, step)] * abs(detents))
+
+    def burst(self, events, repeat=1):
+        """
+        Send a pattern of events as fast as the handler accepts them
+
+        Parameters
+        ----------
+        events : iterable
+            :class:`.Event` objects, restamped with the current time
+
+        repeat : int, optional
+            Number of times the pattern is sent
+        """
+        pattern = [(evt.type, evt.code, evt.value) for evt in events]
+        self._send(pattern * repeat)
+
+    async def spin(self, detents, rate=None):
+        """
+        Turn the dial at a steady rate
+
+        Parameters
+        ----------
+        detents : int
+            Number of detents, negative values turn counter-clockwise
+
+        rate : float, optional
+            Detents per second, by default every detent is sent at once
+        """
+        if not rate:
+            self.rotate(detents)
+            return await self.drain()
+        step  = 1 if detents > 0 else -1
+        total = abs(detents)
+        done  = 0
+        start = time.monotonic()
+        while done < total:
+            #Send every detent that is due, in a single write
+            due = min(total, int((time.monotonic() - start) * rate) + 1)
+            if due > done:
+                self.rotate(step * (due - done))
+                done = due
+            await asyncio.sleep(max(0, done / rate
+                                       - (time.monotonic() - start)))
+        await self.drain()
+
+    async def drain(self):
+        """
+        Wait until every held back event has been written to the pipe
+        """
+        if self._outbox:
+            if self._drained is None:
+                self._drained = self.loop.create_future()
+            await self._drained
+
+    def collect(self):
+        """
+        Read the LED instructions written by the handler
+
+        Returns
+        -------
+        leds : list
+            :class:`.LedEvent` objects written since the last collection
+        """
+        self._partial.extend(self.received())
+        end = len(self._partial) - len(self._partial) % EVENT_SIZE
+        leds = [LedEvent.from_value(evt.value)
+                for evt in Event.from_raw_many(self._partial[:end])
+                if evt.type == EventType.MISC and evt.code == MSC_PULSELED]
+        del self._partial[:end]
+        self._leds.extend(leds)
+        return leds
+
+    def _send(self, events):
+        """
+        Pack events with the current time, each followed by a SYN_REPORT
+        """
+        sec, usec = divmod(int(time.time() * 1e6), 1000000)
+        syn = Event(sec, usec, EventType.NULL, 0, 0).raw
+        self._outbox.extend(b''.join(Event(sec, usec, *evt).raw + syn
+                                     for evt in events))
+        self.sent += len(events)
+        self._flush()
+
+    def _flush(self):
+        """
+        Write as much of the held back events as the pipe accepts
+        """
+        while self._outbox:
+            try:
+                n = os.write(self._inject, self._outbox)
+            except BlockingIOError:
+                break
+            del self._outbox[:n]
+        #Wait for the handler to make room
+        if self._outbox and not self._writing:
+            self.loop.add_writer(self._inject, self._flush)
+            self._writing = True
+        elif not self._outbox:
+            if self._writing:
+                self.loop.remove_writer(self._inject)
+                self._writing = False
+            if self._drained is not None:
+                self._drained.set_result(None)
+                self._drained = None
+
+    def disconnect(self):
+        if self._writing:
+            self.loop.remove_writer(self._inject)
+            self._writing = False
+        self._outbox.clear()
+        super().disconnect()
+
+    def close(self):
+        if self._received is not None and not self.loop.is_closed():
+            self.loop.remove_reader(self._received)
+        super().close()
@@ -0,0 +1,170 @@
+"""
+Lightweight watching of device nodes with the Linux inotify API, used to find
+out when an unplugged PowerMate returns. The kernel notifies the event loop of
+changes to the directory holding the device, so waiting for a device costs
+nothing until it reappears.
+"""
+##############
+#  Standard  #
+##############
+import os
+import errno
+import struct
+import ctypes
+import asyncio
+import logging
+import ctypes.util
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+
+logger = logging.getLogger(__name__)
+
+#inotify event masks from <sys/inotify.h>
+IN_ATTRIB      = 0x00000004
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED     = 0x00008000
+
+#Creation of the node and the permission change udev makes afterwards
+WATCH_MASK = IN_CREATE | IN_ATTRIB | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+
+#wd, mask, cookie, len followed by the NUL padded name
+INOTIFY_EVENT = struct.Struct('iIII')
+
+_libc = None
+
+
+def _inotify():
+    """
+    Load the inotify functions from the C library
+    """
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p,
+                                           ctypes.c_uint32)
+        _libc = libc
+    return _libc
+
+
+def _check(ret):
+    if ret < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+    return ret
+
+
+class DeviceWatcher:
+    """
+    Watch for changes to a device node
+
+    The directory holding the device is watched, or the closest existing
+    parent directory if it has been removed along with the device
+
+    Parameters
+    ----------
+    path : str
+        Filepath of the device
+
+    loop : ``asyncio.event_loop``, optional
+        Event loop notified when the directory changes
+    """
+    def __init__(self, path, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self.path     = os.path.abspath(path)
+        self.loop     = loop
+        self._libc    = _inotify()
+        self._fd      = _check(self._libc.inotify_init1(os.O_NONBLOCK |
+                                                        os.O_CLOEXEC))
+        self._wd      = None
+        self._future  = None
+        self._changed = False
+        self._watch()
+        self.loop.add_reader(self._fd, self._on_readable)
+
+    def _watch(self):
+        """
+        Watch the closest existing directory on the path to the device
+        """
+        if self._wd is not None:
+            self._libc.inotify_rm_watch(self._fd, self._wd)
+        directory = os.path.dirname(self.path)
+        while True:
+            try:
+                self._wd = _check(self._libc.inotify_add_watch(
+                                        self._fd, os.fsencode(directory),
+                                        WATCH_MASK))
+                break
+            except FileNotFoundError:
+                directory = os.path.dirname(directory)
+        self._directory = directory
+        #Name of the entry that leads to the device
+        relative     = self.path[len(directory):].lstrip(os.sep)
+        self._target = relative.split(os.sep)[0]
+        logger.debug("Watching %s for %s", directory, self._target)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        relevant = False
+        offset   = 0
+        while offset < len(data):
+            wd, mask, cookie, size = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset+size].rstrip(b'\0')
+            offset += size
+            if os.fsdecode(name) == self._target or mask & IN_IGNORED:
+                relevant = True
+        if not relevant:
+            return
+        #A missing directory on the path has been created, or removed
+        if (self._directory != os.path.dirname(self.path)
+                or not os.path.isdir(self._directory)):
+            self._watch()
+        if self._future and not self._future.done():
+            self._future.set_result(None)
+        else:
+            self._changed = True
+
+    async def wait(self):
+        """
+        Wait for the next change to the device node
+        """
+        if self._changed:
+            self._changed = False
+            return
+        self._future = self.loop.create_future()
+        try:
+            await self._future
+        finally:
+            self._future = None
+
+    def close(self):
+        """
+        Stop watching the device
+        """
+        if self._fd is not None:
+            if not self.loop.is_closed():
+                self.loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
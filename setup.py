@@ -7,7 +7,8 @@ setup(name     = 'powermate',
       license  = 'BSD',
       author   = 'Teddy Rendahl',
 
-      packages    = find_packages(),
-      description = 'Python Driver for PowerMate USB Knob',
+      packages        = find_packages(),
+      description     = 'Python Driver for PowerMate USB Knob',
+      python_requires = '>=3.7',
 
     )
@@ -1,9 +1,7 @@
 ##############
 #  Standard  #
 ##############
-import io
 import logging
-import tempfile
 
 ##############
 #  External  #
@@ -24,7 +22,7 @@ def pytest_addoption(parser):
 @pytest.fixture(scope='session', autouse=True)
 def set_level(pytestconfig):
     #Read user input logging level
-    log_level = getattr(logging, pytest.config.getoption('--log'), None)
+    log_level = getattr(logging, pytestconfig.getoption('--log'), None)
 
     #Report invalid logging level
     if not isinstance(log_level, int):
@@ -35,9 +33,5 @@ def set_level(pytestconfig):
 
 @pytest.fixture(scope='module')
 def pseudo_socket():
-    with tempfile.NamedTemporaryFile() as tmp:
-        s = powermate.event.Socket(tmp.name)
-        s._input  = io.BytesIO()
-        s._output = io.BytesIO()
-        yield s
+    yield powermate.event.Socket(powermate.ReplayTransport(b''))
 
@@ -0,0 +1,30 @@
+##############
+#  Standard  #
+##############
+import os
+import sys
+import json
+import subprocess
+
+##############
+#  External  #
+##############
+
+##############
+#   Module   #
+##############
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_benchmarks_quick():
+    #The suite runs against the library in this tree
+    env = dict(os.environ, PYTHONPATH=root)
+    proc = subprocess.run([sys.executable,
+                           os.path.join(root, 'benchmarks', 'run.py'),
+                           '--quick'],
+                          env=env, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, timeout=120)
+    assert proc.returncode == 0, proc.stderr.decode()
+    results = json.loads(proc.stdout.decode())
+    for key in ('decode', 'dispatch', 'latency', 'latency_loaded'):
+        assert key in results
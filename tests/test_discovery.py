@@ -0,0 +1,71 @@
+##############
+#  Standard  #
+##############
+import os
+
+##############
+#  External  #
+##############
+import pytest
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate import discovery
+from powermate.errors import DeviceNotFound
+
+
+def add_device(root, node, vendor, product):
+    """
+    Register an input device in a fake sysfs
+    """
+    ids = root / 'sys' / 'class' / 'input' / node / 'device' / 'id'
+    ids.mkdir(parents=True)
+    (ids / 'vendor').write_text('{:04x}\n'.format(vendor))
+    (ids / 'product').write_text('{:04x}\n'.format(product))
+    (root / 'dev' / 'input' / node).touch()
+
+
+@pytest.fixture(scope='function')
+def devices(tmp_path):
+    (tmp_path / 'dev' / 'input' / 'by-id').mkdir(parents=True)
+    add_device(tmp_path, 'event3', 0x077d, 0x0410)
+    add_device(tmp_path, 'event4', 0x046d, 0xc52b)
+    #Device only known through its udev link
+    (tmp_path / 'dev' / 'input' / 'event12').touch()
+    os.symlink('../event12', str(tmp_path / 'dev' / 'input' / 'by-id' /
+               'usb-Griffin_Technology__Inc._Griffin_PowerMate-event-if00'))
+    return tmp_path
+
+
+def test_scan(devices):
+    root = str(devices / 'dev' / 'input')
+    assert discovery.scan(sysfs=str(devices / 'sys'), devices=root) == [
+            os.path.join(root, 'event3'), os.path.join(root, 'event12')]
+
+
+def test_cache(devices):
+    cache = discovery.DeviceCache(sysfs=str(devices / 'sys'),
+                                  devices=str(devices / 'dev' / 'input'))
+    assert len(cache.paths()) == 2
+    #Sysfs is not scanned again until the device directory changes
+    ids = devices / 'sys' / 'class' / 'input' / 'event4' / 'device' / 'id'
+    (ids / 'vendor').write_text('077d\n')
+    (ids / 'product').write_text('0410\n')
+    assert len(cache.paths()) == 2
+    add_device(devices, 'event7', 0x077d, 0x04aa)
+    assert len(cache.paths()) == 4
+    cache.close()
+
+
+def test_discover(devices, monkeypatch):
+    monkeypatch.setattr(discovery, '_cache', discovery.DeviceCache(
+                                sysfs=str(devices / 'sys'),
+                                devices=str(devices / 'dev' / 'input')))
+    pm = powermate.PowerMateBase.discover(index=1)
+    assert pm._source.path == str(devices / 'dev' / 'input' / 'event12')
+    pm._source.transport.close()
+    with pytest.raises(DeviceNotFound):
+        powermate.PowerMateBase.discover(index=2)
+    discovery._cache.close()
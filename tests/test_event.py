@@ -1,10 +1,12 @@
 ##############
 #  Standard  #
 ##############
+import pickle
 
 ##############
 #  External  #
 ##############
+import pytest
 
 ##############
 #   Module   #
@@ -74,6 +76,130 @@ def test_socket_send(pseudo_socket):
     #Send an event to a binary file
     evt = powermate.Event.stop()
     pseudo_socket.send(evt)
-    pseudo_socket._input.seek(0)
     #Assert we translated the whole Event
-    assert pseudo_socket._input.read() == evt.raw
+    assert pseudo_socket.transport.written == evt.raw
+
+def test_socket_suppress():
+    socket = powermate.event.Socket(powermate.ReplayTransport(b''))
+    led_max, led_off = powermate.LedEvent.max(), powermate.LedEvent.off()
+    assert socket.send(led_max)
+    #Identical LED states are not written again
+    assert not socket.send(led_max)
+    assert not socket.send(powermate.LedEvent(brightness=255))
+    assert socket.send(led_max, force=True)
+    assert socket.send(led_off)
+    assert socket.transport.written == led_max.raw * 2 + led_off.raw
+
+def test_socket_read():
+    #Read several events and a partial event in a single call
+    socket = powermate.event.Socket(powermate.ReplayTransport(raw_evt * 3
+                                                              + raw_evt[:10]))
+    evts = socket.read()
+    assert len(evts) == 3
+    assert all(evt.value == 1 for evt in evts)
+    #Complete the partial event with the next read
+    socket.transport = powermate.ReplayTransport(raw_evt[10:])
+    evts = socket.read()
+    assert len(evts) == 1
+    assert evts[0].tv_sec == 1444495
+
+def test_from_raw_many():
+    #Convert a buffer of several events at once
+    evts = powermate.Event.from_raw_many(raw_evt * 3)
+    assert len(evts) == 3
+    for evt in evts:
+        assert evt.tv_sec  == 1444495
+        assert evt.tv_usec == 3055030404
+        assert evt.type    == powermate.event.EventType.PUSH
+        assert evt.code    == 256
+        assert evt.value   == 1
+    #Unrecognized events are skipped
+    bad = powermate.event.EVENT_STRUCT.pack(0, 0, 0x03, 0, 0)
+    assert len(powermate.Event.from_raw_many(raw_evt + bad + raw_evt)) == 2
+
+def test_led_immutable():
+    evt = powermate.LedEvent.percent(50)
+    #No instance dictionary and no attribute changes
+    assert not hasattr(evt, '__dict__')
+    with pytest.raises(AttributeError):
+        evt.brightness = 0
+    #Packed value matches the original bit-packing
+    assert evt.value == 128
+    assert evt.raw == powermate.Event(0, 0, powermate.event.EventType.MISC,
+                                      powermate.event.MSC_PULSELED, 128).raw
+    #Copies rebuild the same event
+    assert pickle.loads(pickle.dumps(evt)).raw == evt.raw
+    assert repr(evt).startswith('LedEvent(tv_sec=0')
+
+def test_led_shared():
+    #Factory methods return the same pre-built instances
+    assert powermate.LedEvent.percent(100) is powermate.LedEvent.max()
+    assert powermate.LedEvent.percent(0) is powermate.LedEvent.off()
+    assert powermate.LedEvent.pulse() is powermate.LedEvent.pulse()
+    #Subclasses are not handed LedEvent instances
+    class Custom(powermate.LedEvent):
+        pass
+    assert type(Custom.max()) is Custom
+
+def rotation(value, tv_usec=0):
+    return powermate.Event(1, tv_usec, powermate.event.EventType.ROTATE,
+                           7, value)
+
+syn  = powermate.Event(1, 0, powermate.event.EventType.NULL, 0, 0)
+push = powermate.Event(1, 0, powermate.event.EventType.PUSH, 256, 1)
+
+@pytest.mark.parametrize('policy, values, dropped', [('drop-oldest',
+                                                      [3, 4, 5], 2),
+                                                     ('drop-newest',
+                                                      [1, 2, 3], 2),
+                                                     ('block',
+                                                      [1, 2, 3, 4, 5], 0)])
+def test_queue_drop(policy, values, dropped):
+    queue = powermate.event.EventQueue(3, policy=policy)
+    queue.extend([rotation(i) for i in range(1, 6)])
+    assert [evt.value for evt in queue] == values
+    assert queue.stats['dropped'] == dropped
+    assert queue.full
+
+def test_queue_merge():
+    queue = powermate.event.EventQueue(4, policy='merge-rotations')
+    queue.extend([rotation(1), syn, rotation(2), syn])
+    #Rotations and their SYN_REPORT fold into the last queued rotation
+    queue.extend([rotation(3, tv_usec=5), syn, rotation(4, tv_usec=6), syn])
+    assert [(evt.type, evt.value) for evt in queue] == [
+                        (rotation(1).type, 1), (syn.type, 0),
+                        (rotation(1).type, 9), (syn.type, 0)]
+    assert queue[2].tv_usec == 6
+    assert queue.stats['merged'] == 2
+    #Button events are kept, rotations after them are not merged across
+    queue.extend([push, syn, rotation(5)])
+    assert [evt.value for evt in queue][4:] == [1, 0, 5]
+    assert queue.stats['merged'] == 2
+    queue.extend([syn, rotation(6), syn])
+    assert [evt.value for evt in queue][4:] == [1, 0, 11, 0]
+    assert queue.stats['merged'] == 3
+    assert queue.stats['dropped'] == 0
+
+def test_queue_high_water():
+    marks = list()
+    queue = powermate.event.EventQueue(4, policy='drop-newest', high_water=2,
+                                       on_high_water=marks.append)
+    queue.extend([rotation(1)])
+    queue.extend([rotation(2), rotation(3)])
+    #Only reported when rising to the mark
+    queue.extend([rotation(4)])
+    queue.clear()
+    queue.extend([rotation(5), rotation(6)])
+    assert marks == [3, 2]
+    assert queue.stats['high_water'] == 2
+    with pytest.raises(ValueError):
+        powermate.event.EventQueue(4, policy='unbounded')
+
+def test_led_shared_bounded():
+    cached = len(powermate.event._led_cache)
+    #Out of range settings are built fresh rather than remembered
+    evt = powermate.LedEvent.percent(-40)
+    assert evt.brightness == -102
+    assert evt is not powermate.LedEvent.percent(-40)
+    assert powermate.LedEvent.from_value(0x123456).value == 0x123456
+    assert len(powermate.event._led_cache) == cached == 257
@@ -0,0 +1,90 @@
+##############
+#  Standard  #
+##############
+import asyncio
+
+##############
+#  External  #
+##############
+import pytest
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate.event import LedEvent, Event
+
+
+class Knob(powermate.PowerMateBase):
+    """
+    PowerMate that sums rotations and stops when pressed
+    """
+    def __init__(self, *args, **kwargs):
+        self.total = 0
+        super().__init__(*args, **kwargs)
+
+    def rotated(self, value, pressed=False):
+        self.total += value
+        return LedEvent.percent(min(100, abs(self.total)))
+
+    def pressed(self):
+        return Event.stop()
+
+
+@pytest.fixture(scope='function')
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_manager(loop):
+    manager = powermate.PowerMateManager(loop=loop)
+    devices = [powermate.VirtualPowerMate(loop=loop) for i in range(8)]
+    knobs   = [manager.add(Knob(device, loop=loop, reader=True),
+                           name='knob{}'.format(i))
+               for i, device in enumerate(devices)]
+    #Every device receives its own input
+    for i, device in enumerate(devices):
+        device.rotate(i + 1)
+        device.press()
+    manager.run()
+    assert [knob.total for knob in knobs] == list(range(1, 9))
+    assert devices[3].leds[-1] == LedEvent.percent(4)
+    stats = manager.stats()
+    assert stats['knob3']['rotated'] == 4
+    assert stats['knob3']['written'] == 4
+    assert stats['knob3']['events'] == 10
+    assert not stats['knob3']['running']
+    for device in devices:
+        device.close()
+
+
+def test_manager_isolation(loop):
+    manager = powermate.PowerMateManager(loop=loop)
+    healthy = powermate.VirtualPowerMate(loop=loop)
+    broken  = powermate.VirtualPowerMate(loop=loop)
+    manager.add(Knob(healthy, loop=loop, reader=True), name='healthy')
+    manager.add(Knob(broken, loop=loop, reader=True), name='broken')
+    #Handlers on another loop are refused
+    other = asyncio.new_event_loop()
+    with pytest.raises(ValueError):
+        manager.add(Knob(powermate.ReplayTransport(b''), loop=other))
+    other.close()
+
+    async def script():
+        broken.disconnect()
+        await asyncio.sleep(0.01)
+        #The remaining device is still served
+        assert manager.stats()['healthy']['running']
+        healthy.rotate(5)
+        healthy.press()
+
+    loop.create_task(script())
+    manager.run()
+    stats = manager.stats()
+    assert isinstance(stats['broken']['error'], ConnectionError)
+    assert stats['healthy']['error'] is None
+    assert stats['healthy']['rotated'] == 5
+    healthy.close()
+    broken.close()
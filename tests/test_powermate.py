@@ -1,9 +1,9 @@
 ##############
 #  Standard  #
 ##############
-import io
 import asyncio
-import tempfile
+import threading
+import concurrent.futures
 
 ##############
 #  External  #
@@ -34,51 +34,42 @@ events = [
     Event(23442040, 340340, EventType.PUSH, 1, 1),
     Event(53443040, 340340, EventType.PUSH, 1, 0)]
 
-class PseudoStream(io.BytesIO):
+def replay(stream=events):
     """
-    BytesIO object that continually adds new events
+    Transport playing back a list of events
     """
-    def __init__(self, stream, *args, **kwargs):
-        self.stream = stream
-        super().__init__(*args, **kwargs)
-
-    def read(self, *args, **kwargs):
-        return self.stream.pop(0).raw
+    return powermate.ReplayTransport.from_events(stream)
 
 
 class CountingPowerMate(powermate.PowerMateBase):
     """
     PowerMate that counts the Events that happen
     """
-    def __init__(self, path, loop=None):
+    def __init__(self, path, loop=None, **kwargs):
         #Store actions
         self.presses        = 0
         self.releases       = 0
         self.rotations      = 0
+        self.rotate_calls   = 0
         self.twists         = 0
         self.twist_releases = 0 
-        super().__init__(path, loop=loop)
-        #Replace output with PseudoStream / input with file-like BytesIO
-        self._source._output = PseudoStream(events)
-        self._source._input  = io.BytesIO()
+        super().__init__(path, loop=loop, **kwargs)
 
-    @asyncio.coroutine
-    def pressed(self):
-        super().pressed()
+    async def pressed(self):
+        await super().pressed()
         self.presses += 1
         return self.illuminate(100)
 
-    @asyncio.coroutine
-    def rotated(self, value, pressed):
-        super().rotated(value, pressed=pressed)
+    async def rotated(self, value, pressed):
+        await super().rotated(value, pressed=pressed)
+        self.rotate_calls += 1
         if pressed:
             self.twists += value
         else:
             self.rotations += value
 
-    @asyncio.coroutine
-    def released(self, time, rotated):
-        super().released(time)
+    async def released(self, time, rotated):
+        await super().released(time)
         self.releases +=  1
         self.twist_releases += int(rotated)
         if time > 1000000:
@@ -87,8 +78,7 @@ class CountingPowerMate(powermate.PowerMateBase):
 
 @pytest.fixture(scope='function')
 def counting_powermate():
-    with tempfile.NamedTemporaryFile() as tmp:
-        yield CountingPowerMate(tmp.name)
+    yield CountingPowerMate(replay())
 
 def test_powermatebase(counting_powermate):
     #Load PowerMate
@@ -101,7 +91,376 @@ def test_powermatebase(counting_powermate):
     assert counting_powermate.twists         == 5
     assert counting_powermate.twist_releases == 1
     #Check that we wrote back events to the Powermate
-    counting_powermate._source._input.seek(0)
-    _bytes = counting_powermate._source._input.read()
+    _bytes = counting_powermate._source.transport.written
+    assert LedEvent.max().raw in _bytes
+    assert LedEvent.off().raw in _bytes
+
+#Events as reported by the kernel, with a SYN_REPORT terminating each frame
+frames = list()
+for evt in events:
+    frames.extend([evt, Event(evt.tv_sec, evt.tv_usec, EventType.NULL, 0, 0)])
+
+def run_from_pipe(stream=events, **kwargs):
+    """
+    Run a CountingPowerMate in reader mode with every event already queued
+    """
+    #Use a pipe the event loop can watch
+    transport = powermate.PipeTransport()
+    transport.inject(b''.join(evt.raw for evt in stream))
+    pm = CountingPowerMate(transport, reader=True, **kwargs)
+    #Run through event stream as the pipe reports readable
+    pm.run()
+    pm.written = transport.received()
+    transport.close()
+    return pm
+
+def test_powermatebase_reader():
+    pm = run_from_pipe()
+    #Check our count of actions
+    assert pm.presses        == 4
+    assert pm.releases       == 4
+    assert pm.rotations      == 2
+    assert pm.twists         == 5
+    assert pm.twist_releases == 1
+    assert pm.rotate_calls   == 3
+    #Check that we wrote back events to the Powermate
+    _bytes = pm.written
     assert LedEvent.max().raw in _bytes
     assert LedEvent.off().raw in _bytes
+
+def test_powermatebase_thread():
+    pm = run_from_pipe(thread=True)
+    #Events decoded by the reader thread are dispatched on the loop
+    assert pm.presses        == 4
+    assert pm.releases       == 4
+    assert pm.rotations      == 2
+    assert pm.twists         == 5
+    assert pm.twist_releases == 1
+    assert LedEvent.max().raw in pm.written
+
+@pytest.mark.parametrize('window', [None, 0.008])
+def test_powermatebase_coalesce(window):
+    pm = run_from_pipe(coalesce=True, window=window)
+    #Buffered rotations are delivered in a single call
+    assert pm.rotate_calls   == 2
+    assert pm.rotations      == 2
+    assert pm.twists         == 5
+    assert pm.twist_releases == 1
+
+def test_powermatebase_frames():
+    pm = run_from_pipe(stream=frames, frames=True)
+    #Each frame triggers the same callbacks as the bare events
+    assert pm.presses        == 4
+    assert pm.releases       == 4
+    assert pm.rotations      == 2
+    assert pm.twists         == 5
+    assert pm.twist_releases == 1
+    assert pm.rotate_calls   == 3
+
+def test_frame():
+    #Rotations within a frame are summed
+    frame = powermate.event.Frame([Event(0, 0, EventType.ROTATE, 7, 2),
+                                   Event(0, 0, EventType.PUSH, 0, 1),
+                                   Event(0, 0, EventType.ROTATE, 7, -1)],
+                                  Event(1, 2, EventType.NULL, 0, 0))
+    assert frame.rotate.value == 1
+    assert frame.push.value   == 1
+    assert (frame.tv_sec, frame.tv_usec) == (1, 2)
+
+class OldStylePowerMate(CountingPowerMate):
+    """
+    PowerMate written with generator based coroutines
+    """
+    @powermate.coroutine
+    def pressed(self):
+        yield from asyncio.sleep(0)
+        return (yield from super().pressed())
+
+    @powermate.coroutine
+    def rotated(self, value, pressed):
+        self.rotations += value
+
+def test_old_style_handlers():
+    pm = OldStylePowerMate(replay())
+    pm.run()
+    assert pm.presses   == 4
+    assert pm.releases  == 4
+    assert pm.rotations == 7
+    #Check that we wrote back events from the generator
+    assert LedEvent.max().raw in pm._source.transport.written
+
+@pytest.mark.skipif(powermate.event._is_coroutine is None,
+                    reason='asyncio.coroutine is not available')
+def test_debug_coroutine_handlers():
+    #asyncio.coroutine in debug mode returns a plain function marked as a
+    #coroutine, that returns a wrapper around the generator
+    def rotated(self, value, pressed):
+        return CountingPowerMate.rotated(self, value, pressed)
+    rotated._is_coroutine = powermate.event._is_coroutine
+
+    class DebugPowerMate(CountingPowerMate):
+        pass
+    DebugPowerMate.rotated = rotated
+    pm = DebugPowerMate(replay())
+    assert 'rotated' in pm._awaited
+    pm.run()
+    assert pm.rotate_calls == 3
+    assert pm.rotations + pm.twists == 7
+
+class SyncPowerMate(CountingPowerMate):
+    """
+    PowerMate with plain function handlers
+    """
+    def pressed(self):
+        self.presses += 1
+        return self.illuminate(100)
+
+    def rotated(self, value, pressed):
+        self.rotate_calls += 1
+        self.rotations    += value
+
+def test_sync_handlers():
+    pm = SyncPowerMate(replay())
+    assert pm._awaited == frozenset(['released', 'on_frame'])
+    pm.run()
+    assert pm.presses      == 4
+    assert pm.releases     == 4
+    assert pm.rotations    == 7
+    assert pm.rotate_calls == 3
+    assert LedEvent.max().raw in pm._source.transport.written
+
+def test_run_async():
+    loop = asyncio.new_event_loop()
+    transport = powermate.PipeTransport()
+    pm = CountingPowerMate(transport, reader=True)
+    ticks = list()
+
+    async def service():
+        #Another service sharing the loop
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        other = loop.create_task(service())
+        transport.inject(b''.join(evt.raw for evt in events))
+        await pm.run_async()
+        #The loop keeps running the other service
+        count = len(ticks)
+        await asyncio.sleep(0.01)
+        assert len(ticks) > count
+        #Run in the background until the block is left
+        async with pm:
+            transport.inject(events[0].raw)
+            await asyncio.sleep(0.01)
+        other.cancel()
+
+    loop.run_until_complete(main())
+    assert pm.loop is loop
+    assert pm.presses  == 5
+    assert pm.releases == 4
+    transport.close()
+    loop.close()
+
+class ExitingPowerMate(powermate.PowerMateBase):
+    """
+    PowerMate turning the LED off when it is done
+    """
+    exits = 0
+
+    def on_exit(self):
+        self.exits += 1
+        self.illuminate(0)
+
+def test_async_with_exit():
+    loop = asyncio.new_event_loop()
+    transport = powermate.PipeTransport()
+    pm = ExitingPowerMate(transport, reader=True, loop=loop)
+    pm.illuminate(100)
+
+    async def main():
+        async with pm:
+            await asyncio.sleep(0.01)
+
+    #Leaving the block cancels the run, cleanup still happens
+    loop.run_until_complete(main())
+    assert pm.exits == 1
+    assert transport.received() == (LedEvent.max().raw
+                                     + LedEvent.off().raw)
+    transport.close()
+    loop.close()
+
+class SlowPowerMate(powermate.PowerMateBase):
+    """
+    PowerMate whose earlier rotations take longer to handle
+    """
+    def __init__(self, *args, **kwargs):
+        self.started  = list()
+        self.finished = list()
+        super().__init__(*args, **kwargs)
+
+    async def rotated(self, value, pressed=False):
+        self.started.append(value)
+        await asyncio.sleep(0.01 * (5 - value))
+        self.finished.append(value)
+        return LedEvent.percent(value * 10)
+
+    def pressed(self):
+        return Event.stop()
+
+@pytest.mark.parametrize('max_in_flight, finished', [(1, [1, 2, 3, 4]),
+                                                     (4, [4, 3, 2, 1])])
+def test_concurrent_dispatch(max_in_flight, finished):
+    stream = [Event(1, i, EventType.ROTATE, 7, i) for i in range(1, 5)]
+    pm = SlowPowerMate(replay(stream + [events[0]]),
+                       max_in_flight=max_in_flight)
+    pm.run()
+    assert pm.finished == finished
+    #Results are written in the order of the events
+    assert pm._source.transport.written == b''.join(
+                            LedEvent.percent(i * 10).raw for i in range(1, 5))
+
+class SlowRotationPowerMate(SlowPowerMate):
+
+    async def released(self, time, rotated=False):
+        self.started.append('released')
+        self.finished.append('released')
+        return LedEvent.max()
+
+@pytest.mark.parametrize('per_kind, finished', [(False, [1, 'released']),
+                                                (True, ['released', 1])])
+def test_concurrent_per_kind(per_kind, finished):
+    leds = {1: LedEvent.percent(10).raw, 'released': LedEvent.max().raw}
+    transport = powermate.PipeTransport()
+    pm = SlowRotationPowerMate(transport, reader=True, max_in_flight=1,
+                               per_kind=per_kind)
+    #Only the slow rotation holds up a release when limited per kind
+    transport.inject(Event(1, 0, EventType.ROTATE, 7, 1).raw
+                     + Event(1, 0, EventType.PUSH, 256, 0).raw)
+    pm.loop.call_later(0.1, transport.inject, events[0].raw)
+    #Results written while the rotation is still running
+    early = list()
+    pm.loop.call_later(0.02, lambda: early.append(transport.received()))
+    pm.run()
+    assert pm.started  == [1, 'released']
+    assert pm.finished == finished
+    assert early[0] == (leds['released'] if per_kind else b'')
+    #Results are written as soon as the handler is next in line
+    assert early[0] + transport.received() == b''.join(leds[kind]
+                                                       for kind in finished)
+    transport.close()
+
+def brightness(value, pressed=False):
+    return LedEvent.percent(value * 10)
+
+class OffloadPowerMate(powermate.PowerMateBase):
+    """
+    PowerMate computing rotations away from the event loop
+    """
+    @powermate.offload
+    def rotated(self, value, pressed=False):
+        self.threads.append(threading.get_ident())
+        return LedEvent.percent(value * 10)
+
+    def pressed(self):
+        return Event.stop()
+
+@pytest.mark.parametrize('max_in_flight', [None, 4])
+def test_offload(max_in_flight):
+    stream = [Event(1, i, EventType.ROTATE, 7, i) for i in range(1, 5)]
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        pm = OffloadPowerMate(replay(stream + [events[0]]), executor=executor,
+                              max_in_flight=max_in_flight)
+        pm.threads = list()
+        pm.run()
+    assert len(pm.threads) == 4
+    assert threading.get_ident() not in pm.threads
+    assert pm._source.transport.written == b''.join(
+                            LedEvent.percent(i * 10).raw for i in range(1, 5))
+
+def test_offload_process():
+    stream = [Event(1, i, EventType.ROTATE, 7, i) for i in range(1, 5)]
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+        #Module level functions are called without the PowerMate
+        class ProcessPowerMate(powermate.PowerMateBase):
+            rotated = powermate.offload(brightness, executor=executor,
+                                         bound=False)
+            pressed = OffloadPowerMate.pressed
+        pm = ProcessPowerMate(replay(stream + [events[0]]), max_in_flight=2)
+        pm.run()
+    assert pm.stats['rotated'] == 4
+    assert pm._source.transport.written == b''.join(
+                            LedEvent.percent(i * 10).raw for i in range(1, 5))
+
+def test_offload_coroutine():
+    with pytest.raises(TypeError):
+        powermate.offload(SlowPowerMate.rotated)
+
+class QueuedPowerMate(powermate.PowerMateBase):
+    """
+    PowerMate handling rotations slower than they arrive
+    """
+    def __init__(self, *args, **kwargs):
+        self.values  = list()
+        self.longest = 0
+        super().__init__(*args, **kwargs)
+
+    async def rotated(self, value, pressed=False):
+        self.values.append(value)
+        self.longest = max(self.longest, len(self.queue))
+        await asyncio.sleep(0.0005)
+
+    def pressed(self):
+        return Event.stop()
+
+def run_queued(mode, **kwargs):
+    stream = [Event(1, i, EventType.ROTATE, 7, 1) for i in range(200)]
+    transport = powermate.PipeTransport()
+    transport.inject(b''.join(evt.raw for evt in stream + [events[0]]))
+    pm = QueuedPowerMate(transport, queue_size=16, **dict(mode, **kwargs))
+    pm.run()
+    transport.close()
+    return pm
+
+@pytest.mark.parametrize('mode', [dict(), dict(reader=True),
+                                  dict(thread=True)])
+def test_queue_block(mode):
+    pm = run_queued(mode)
+    #Nothing is lost, reading waits for the queue instead
+    assert pm.values == [1] * 200
+    assert pm.queue.stats['blocked'] > 0
+    assert pm.queue.stats['high_water'] == pm.queue.stats['blocked']
+    #Never more than a single read beyond the limit
+    assert pm.longest < 16 + pm._source._read_events
+
+def test_queue_merge_rotations():
+    marks = list()
+    pm = run_queued(dict(reader=True), policy='merge-rotations',
+                    on_high_water=marks.append)
+    #Rotations are combined rather than discarded
+    assert sum(pm.values) == 200
+    assert len(pm.values) < 200
+    assert pm.queue.stats['merged'] == 200 - len(pm.values)
+    assert pm.longest <= 16
+    assert marks
+
+def test_offload_unbound_thread():
+    stream = [Event(1, i, EventType.ROTATE, 7, i) for i in range(1, 5)]
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        #Module level functions are called without the PowerMate in threads
+        class ThreadPowerMate(powermate.PowerMateBase):
+            rotated = powermate.offload(brightness, executor=executor,
+                                        bound=False)
+            pressed = OffloadPowerMate.pressed
+        pm = ThreadPowerMate(replay(stream + [events[0]]))
+        pm.run()
+    assert pm._source.transport.written == b''.join(
+                            LedEvent.percent(i * 10).raw for i in range(1, 5))
+
+def test_offload_bound_process():
+    with concurrent.futures.ProcessPoolExecutor(1) as executor:
+        #Methods can not be sent to another process
+        with pytest.raises(TypeError):
+            OffloadPowerMate(replay(), executor=executor)
+        with pytest.raises(TypeError):
+            powermate.offload(brightness, executor=executor)
@@ -0,0 +1,108 @@
+##############
+#  Standard  #
+##############
+import os
+import asyncio
+
+##############
+#  External  #
+##############
+import pytest
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate.event import LedEvent, Event
+from powermate.watch import DeviceWatcher
+
+
+class HotplugTransport(powermate.PipeTransport):
+    """
+    Pipe that can only be opened while a file stands in for the device node
+    """
+    connected = list()
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        super().__init__()
+        self.path = path
+        self.connected.append(self)
+
+    def reopen(self):
+        return type(self)(self.path)
+
+
+class Knob(powermate.PowerMateBase):
+
+    def rotated(self, value, pressed=False):
+        return LedEvent.percent(30)
+
+    def pressed(self):
+        return Event.stop()
+
+
+@pytest.fixture(scope='function')
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_watcher(loop, tmp_path):
+    #Neither the device nor its directory exist yet
+    path = tmp_path / 'input' / 'event3'
+    with DeviceWatcher(str(path), loop=loop) as watcher:
+
+        async def appear():
+            while not path.exists():
+                await watcher.wait()
+
+        loop.call_later(0.01, (tmp_path / 'input').mkdir)
+        loop.call_later(0.02, path.touch)
+        loop.run_until_complete(asyncio.wait_for(appear(), 1))
+
+
+@pytest.mark.parametrize('reader', [False, True])
+def test_reconnect(loop, tmp_path, reader):
+    path = tmp_path / 'event3'
+    path.touch()
+    HotplugTransport.connected.clear()
+    pm = Knob(HotplugTransport(str(path)), loop=loop, reader=reader,
+              reconnect=True)
+
+    async def unplug():
+        first = HotplugTransport.connected[0]
+        first.inject(Event(1, 0, powermate.event.EventType.ROTATE, 7, 1).raw)
+        await asyncio.sleep(0.01)
+        path.unlink()
+        first.disconnect()
+        await asyncio.sleep(0.01)
+        path.touch()
+        while len(HotplugTransport.connected) < 2:
+            await asyncio.sleep(0.001)
+        second = HotplugTransport.connected[1]
+        await asyncio.sleep(0.01)
+        #Last LED setting is restored on the new device
+        assert second.received() == LedEvent.percent(30).raw
+        second.inject(Event(1, 0, powermate.event.EventType.PUSH, 256, 1).raw)
+
+    task = loop.create_task(unplug())
+    pm.run()
+    task.result()
+    assert pm.stats['reconnects'] == 1
+    assert len(pm.reconnect_times) == 1
+    assert pm._source.transport is HotplugTransport.connected[1]
+    for transport in HotplugTransport.connected:
+        transport.close()
+
+
+def test_no_reconnect(loop):
+    transport = powermate.PipeTransport()
+    pm = Knob(transport, loop=loop, reconnect=True)
+    transport.disconnect()
+    #Transports without a device path can not be waited for
+    with pytest.raises(ConnectionError):
+        pm.run()
+    transport.close()
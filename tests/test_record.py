@@ -0,0 +1,119 @@
+##############
+#  Standard  #
+##############
+import os
+import time
+
+##############
+#  External  #
+##############
+import pytest
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate.event import Event, EventType
+from powermate.record import (Recorder, read_log, write_capture,
+                              CaptureReplay, LOG_MAGIC)
+
+events = [Event(1500000000, 999999, EventType.PUSH, 256, 1),
+          Event(1500000000, 999999, EventType.NULL, 0, 0),
+          Event(1500000001, 4000, EventType.ROTATE, 7, -3),
+          Event(1500000001, 4000, EventType.NULL, 0, 0),
+          Event(1500000001, 2000, EventType.PUSH, 256, 0)]
+
+def fields(evt):
+    return (evt.tv_sec, evt.tv_usec, evt.type, evt.code, evt.value)
+
+def test_recorder(tmpdir):
+    path = str(tmpdir.join('session.log'))
+    with Recorder(path) as recorder:
+        recorder.record(events[:2])
+        recorder.record(events[2:])
+    assert recorder.count == len(events)
+    assert [fields(evt) for evt in read_log(path)] == [fields(evt)
+                                                       for evt in events]
+    #Delta encoded records are much smaller than the raw events
+    assert os.path.getsize(path) < len(LOG_MAGIC) + 24 + 6 * len(events)
+    #A new session is appended to the same log
+    with Recorder(path) as recorder:
+        recorder.record(events[:1])
+    assert [fields(evt) for evt in read_log(path)][-1] == fields(events[0])
+
+def test_handler_recording(tmpdir):
+    path = str(tmpdir.join('session.log'))
+    stream = events[2:4] + [Event(0, 0, EventType.PUSH, 256, 1)]
+
+    class Stopping(powermate.PowerMateBase):
+        def pressed(self):
+            return Event.stop()
+
+    with Recorder(path, flush_interval=60.) as recorder:
+        pm = Stopping(powermate.ReplayTransport.from_events(stream),
+                      recorder=recorder)
+        pm.run()
+        #Buffered events are flushed when the run finishes
+        assert len(list(read_log(path))) == 3
+
+def test_handler_flush_idle(tmpdir):
+    path = str(tmpdir.join('session.log'))
+    transport = powermate.PipeTransport()
+    seen = list()
+
+    class Stopping(powermate.PowerMateBase):
+        def pressed(self):
+            return Event.stop()
+
+    with Recorder(path, flush_interval=0.05) as recorder:
+        pm = Stopping(transport, reader=True, recorder=recorder)
+        transport.inject(b''.join(evt.raw for evt in events[2:4]))
+        #The knob goes idle, the buffer is still written out on time
+        pm.loop.call_later(0.2, lambda: seen.append(len(list(read_log(path)))))
+        pm.loop.call_later(0.25, transport.inject, events[0].raw)
+        pm.run()
+    transport.close()
+    assert seen == [2]
+
+def test_capture_replay(tmpdir):
+    path = str(tmpdir.join('session.cap'))
+    stream = [Event(100, i * 10000, EventType.ROTATE, 7, 1) for i in range(10)]
+    stream.append(Event(100, 100000, EventType.PUSH, 256, 1))
+    assert write_capture(path, stream) == 11
+
+    class Counting(powermate.PowerMateBase):
+        rotations = 0
+
+        def rotated(self, value, pressed=False):
+            self.rotations += value
+
+        def pressed(self):
+            return Event.stop()
+
+    #As fast as possible
+    replay = CaptureReplay(path)
+    assert len(replay) == 11
+    pm = Counting(replay)
+    pm.run()
+    assert pm.rotations == 10
+    replay.close()
+    #Ten times faster than the 0.1 s of the capture
+    replay = CaptureReplay(path, speed=10)
+    pm = Counting(replay)
+    start = time.monotonic()
+    pm.run()
+    assert pm.rotations == 10
+    assert time.monotonic() - start >= 0.009
+    replay.close()
+
+def test_capture_invalid(tmpdir):
+    path = str(tmpdir.join('session.log'))
+    with Recorder(path) as recorder:
+        recorder.record(events)
+    with pytest.raises(ValueError):
+        CaptureReplay(path)
+    #Timed playback could never release a partial event
+    path = str(tmpdir.join('session.cap'))
+    write_capture(path, events)
+    with pytest.raises(ValueError):
+        CaptureReplay(path, speed=1, chunk=8)
@@ -0,0 +1,82 @@
+##############
+#  Standard  #
+##############
+import gc
+import os
+
+##############
+#  External  #
+##############
+import pytest
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate.event import Socket, Event, EventType
+from powermate.errors import EndOfStream
+
+events = [Event(1, i, EventType.ROTATE, 7, 1) for i in range(5)]
+raw = b''.join(evt.raw for evt in events)
+
+@pytest.fixture(params=[powermate.PipeTransport,
+                        powermate.SocketPairTransport])
+def peer_transport(request):
+    transport = request.param()
+    yield transport
+    transport.close()
+
+def test_peer_transport(peer_transport):
+    socket = Socket(peer_transport)
+    #Nothing to read yet
+    assert socket.read() == []
+    #Events injected by the device side, split mid-event
+    peer_transport.inject(raw[:30])
+    assert len(socket.read()) == 1
+    peer_transport.inject(raw[30:])
+    assert [evt.tv_usec for evt in socket.read()] == [1, 2, 3, 4]
+    #Events written by the handler reach the device side
+    socket.send(powermate.LedEvent.max())
+    assert peer_transport.received() == powermate.LedEvent.max().raw
+    #Unplugging the device is reported
+    peer_transport.disconnect()
+    with pytest.raises(ConnectionError):
+        socket.read()
+
+def test_replay_transport():
+    socket = Socket(powermate.ReplayTransport(raw, chunk=48))
+    #Reads are limited to the chunk size
+    assert len(socket.read()) == 2
+    assert len(socket.read()) == 2
+    assert len(socket.read()) == 1
+    #Finished replay
+    with pytest.raises(EndOfStream):
+        socket.read()
+    #Replay has no file descriptor for the event loop
+    with pytest.raises(OSError):
+        socket.fileno()
+
+def test_device_transport(tmp_path):
+    #A FIFO stands in for the device node
+    path = str(tmp_path / 'event3')
+    os.mkfifo(path)
+    fds = len(os.listdir('/proc/self/fd'))
+    with Socket(path) as socket:
+        #A single descriptor for both directions
+        assert len(os.listdir('/proc/self/fd')) == fds + 1
+        assert socket.read() == []
+        #Written events loop back through the FIFO
+        socket.send(powermate.LedEvent.max())
+        assert socket.read()[0].value == powermate.LedEvent.max().value
+    assert socket.transport.closed
+    assert len(os.listdir('/proc/self/fd')) == fds
+
+def test_device_transport_dropped(tmp_path):
+    path = str(tmp_path / 'event3')
+    os.mkfifo(path)
+    fds = len(os.listdir('/proc/self/fd'))
+    #Handlers recreated without being closed do not leak their device
+    for i in range(50):
+        powermate.PowerMateBase(path)
+    gc.collect()
+    assert len(os.listdir('/proc/self/fd')) == fds
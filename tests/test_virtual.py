@@ -0,0 +1,157 @@
+##############
+#  Standard  #
+##############
+import asyncio
+
+##############
+#  External  #
+##############
+import pytest
+
+##############
+#   Module   #
+##############
+import powermate
+from powermate.event import LedEvent, Event, EventType
+
+
+class LedPowerMate(powermate.PowerMateBase):
+    """
+    PowerMate that lights up while pressed and stops on a double click
+    """
+    def __init__(self, *args, **kwargs):
+        self.rotations = 0
+        self.clicks    = 0
+        super().__init__(*args, **kwargs)
+
+    def pressed(self):
+        return LedEvent.max()
+
+    def released(self, time, rotated=False):
+        self.clicks += 1
+        if self.clicks == 2:
+            return Event.stop()
+        return LedEvent.percent(50)
+
+    def rotated(self, value, pressed=False):
+        self.rotations += value
+
+
+@pytest.fixture(scope='function')
+def virtual():
+    loop   = asyncio.new_event_loop()
+    device = powermate.VirtualPowerMate(loop=loop)
+    yield device
+    device.close()
+    loop.close()
+
+
+def test_virtual_leds(virtual):
+    pm = LedPowerMate(virtual, loop=virtual.loop, reader=True)
+    virtual.click()
+    virtual.rotate(-3)
+    virtual.click()
+    pm.run()
+    assert virtual.sent == 7
+    assert pm.rotations == -3
+    assert virtual.leds == [LedEvent.max(), LedEvent.percent(50),
+                            LedEvent.max()]
+    assert virtual.led is LedEvent.max()
+
+
+@pytest.mark.parametrize('rate', [None, 50000])
+def test_virtual_spin(virtual, rate):
+    pm = LedPowerMate(virtual, loop=virtual.loop, reader=True)
+
+    async def script():
+        #More events than fit in the pipe
+        await virtual.spin(20000, rate=rate)
+        virtual.click()
+        virtual.click()
+
+    virtual.loop.create_task(script())
+    pm.run()
+    assert pm.rotations == 20000
+    assert virtual.sent == 20004
+
+
+def test_virtual_burst(virtual):
+    pm = LedPowerMate(virtual, loop=virtual.loop)
+    virtual.burst([Event(0, 0, EventType.ROTATE, 7, 1),
+                   Event(0, 0, EventType.ROTATE, 7, -2)], repeat=3)
+    virtual.click()
+    virtual.click()
+    pm.run()
+    assert pm.rotations == -3
+    assert len(virtual.leds) == 3
+
+
+def test_led_from_value():
+    led = LedEvent.pulse()
+    assert LedEvent.from_value(led.value) is led
+    assert LedEvent.from_value(LedEvent.percent(20).value).brightness == 51
+
+
+class DimmerPowerMate(powermate.PowerMateBase):
+    """
+    PowerMate setting the brightness from the total rotation
+    """
+    total = 0
+
+    def rotated(self, value, pressed=False):
+        self.total += value
+        return LedEvent.percent(self.total / 20.)
+
+    def pressed(self):
+        return Event.stop()
+
+
+def test_led_rate(virtual):
+    pm = DimmerPowerMate(virtual, loop=virtual.loop, reader=True, led_rate=50)
+
+    async def script():
+        await virtual.spin(2000, rate=20000)
+        virtual.press()
+
+    virtual.loop.create_task(script())
+    pm.run()
+    stats = pm.output.stats
+    assert stats['submitted'] == 2000
+    assert stats['written'] + stats['dropped'] == 2000
+    #Only a handful of writes over a tenth of a second
+    assert len(virtual.leds) == stats['written'] < 20
+    #The final state is always written
+    assert virtual.led is LedEvent.max()
+
+
+def test_led_suppression(virtual):
+    pm = DimmerPowerMate(virtual, loop=virtual.loop, reader=True)
+
+    async def script():
+        await virtual.spin(2000)
+        virtual.press()
+
+    virtual.loop.create_task(script())
+    pm.run()
+    #Only changes in brightness reach the device
+    assert pm.stats['written'] == len(virtual.leds) == 256
+    assert pm.stats['suppressed'] == 2000 - 256
+    #Forcing the state writes it again
+    pm.illuminate(100)
+    pm.illuminate(100, force=True)
+    assert virtual.leds[-2:] == [LedEvent.max()] * 2
+
+
+def test_thread_disconnect(virtual):
+    pm = DimmerPowerMate(virtual, loop=virtual.loop, thread=True)
+
+    async def script():
+        await virtual.spin(500, rate=5000)
+        await asyncio.sleep(0.01)
+        virtual.disconnect()
+
+    virtual.loop.create_task(script())
+    #Errors in the reader thread end the run
+    with pytest.raises(ConnectionError):
+        pm.run()
+    assert pm.total == 500